@@ -1,19 +1,47 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from app.cache import ResponseCache
+from app.changes import ChangeFeed
+from app.metrics import Metrics
 from config import Config
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
+# Cache for task read responses
+cache = ResponseCache()
+
+# Wakes requests waiting on GET /tasks/changes
+change_feed = ChangeFeed()
+
+# Opt-in request instrumentation
+metrics = Metrics()
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Use orjson for JSON responses when it is installed
+    from app.json import ORJSONProvider, orjson
+    if app.config['ORJSON_PROVIDER'] and orjson is not None:
+        app.json = ORJSONProvider(app)
+
     # Initialize extensions
     db.init_app(app)
+    cache.init_app(app)
+    change_feed.init_app(app)
+
+    from app.database import configure_engine
+    configure_engine(app)
+    metrics.init_app(app)
 
     # Register blueprints
     from app.routes import bp as tasks_bp
     app.register_blueprint(tasks_bp)
 
+    # Register CLI commands
+    from app.cli import db_cli, tasks_cli
+    app.cli.add_command(db_cli)
+    app.cli.add_command(tasks_cli)
+
     return app
\ No newline at end of file
@@ -0,0 +1,483 @@
+"""ASGI serving mode with an async database layer.
+
+create_asgi_app wraps the Flask app from create_app in an ASGI application.
+The single-task routes, GET /tasks, /tasks/stats and /tasks/changes are
+served by coroutines on SQLAlchemy's asyncio extension over aiosqlite, so a
+request waiting on the database, or a long poll waiting for changes, holds
+no thread. They run inside the Flask request context and share the Task
+model, the request checks, query builders and response helpers in
+app.routes, the response cache and the before/after request hooks with the
+WSGI app, so both modes give the same responses.
+
+The other routes (bulk writes, export, import, cache counters, /metrics and
+anything unmatched) are passed to the Flask app itself, on a pool of
+ASGI_DELEGATE_THREADS threads, with the request body read from and the
+response streamed to the ASGI server.
+
+Async writes run one at a time under an asyncio lock and open their
+transaction with BEGIN IMMEDIATE, as serialized_writes does for threads. The
+two locks are separate, so writes from the async routes and from the
+delegated ones wait for each other in SQLite, through busy_timeout.
+
+aiosqlite, and an ASGI server such as uvicorn, are only needed for this
+mode. The database has to be a file: every connection to an in-memory
+SQLite database gets its own, empty, database.
+"""
+import asyncio
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, current_app, jsonify, request
+from sqlalchemy import func, make_url, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+
+from app import cache, change_feed, create_app, metrics
+from app.database import _writing, install_hooks
+from app.models import Task, TaskChange
+from app.routes import (apply_update, change_event, change_record, changes_page, changes_position,
+                        changes_query, create_error, created_response, deleted_response, new_task,
+                        parse_changes_request, stats_query, task_not_found, task_response, tasks_page,
+                        tasks_page_query, update_error, updated_response)
+from app.stats import summarize
+from config import Config
+
+try:
+    import aiosqlite
+except ImportError:  # pragma: no cover - optional dependency
+    aiosqlite = None
+
+
+def async_database_url(uri):
+    """Return the aiosqlite URL for a SQLALCHEMY_DATABASE_URI."""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite':
+        raise ValueError(f'ASGI mode supports SQLite only, not {url.get_backend_name()}')
+    if url.database in (None, '', ':memory:'):
+        raise ValueError('ASGI mode needs a file database; in-memory SQLite is private to each connection')
+    return url.set(drivername='sqlite+aiosqlite')
+
+
+def wsgi_environ(scope):
+    """Build a WSGI environ, without wsgi.input, from an ASGI HTTP scope."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        # The body is read to the end rather than to Content-Length
+        'wsgi.input_terminated': True,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def asgi_headers(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] != 'http.request':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+class RequestBody(io.RawIOBase):
+    """Blocking reader over an ASGI receive, for the thread running a delegated request."""
+
+    def __init__(self, receive, loop):
+        self.receive = receive
+        self.loop = loop
+        self.pending = b''
+        self.more = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending and self.more:
+            message = asyncio.run_coroutine_threadsafe(self.receive(), self.loop).result()
+            self.pending = message.get('body', b'')
+            self.more = message['type'] == 'http.request' and message.get('more_body', False)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+class ClientGone(Exception):
+    """The response of a delegated request is no longer being sent."""
+
+
+def serialized_write(handler):
+    """Run an async handler that writes to the database under serialized_writes."""
+    @wraps(handler)
+    async def wrapper(self, session, **kwargs):
+        async with self.serialized_writes(session):
+            return await handler(self, session, **kwargs)
+    return wrapper
+
+
+def cached(handler):
+    """Serve an async handler through the response cache, like ResponseCache.cached."""
+    @wraps(handler)
+    async def wrapper(self, session, **kwargs):
+        key = cache.make_key()
+        response = cache.lookup(key)
+        if response is not None:
+            return response
+        return cache.store(key, current_app.make_response(await handler(self, session, **kwargs)))
+    return wrapper
+
+
+class AsyncTaskApp:
+    """ASGI application serving the task API of a Flask app."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        config = flask_app.config
+        self.engine = create_async_engine(async_database_url(config['SQLALCHEMY_DATABASE_URI']),
+                                          **config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        if config['SQLITE_PRAGMAS'] or config['SQLITE_SERIALIZE_WRITES']:
+            install_hooks(self.engine.sync_engine, config)
+        if flask_app.extensions['metrics'] is not None:
+            metrics.instrument(flask_app, self.engine.sync_engine)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.write_lock = asyncio.Lock() if config['SQLITE_SERIALIZE_WRITES'] else None
+        self.delegate_pool = ThreadPoolExecutor(config['ASGI_DELEGATE_THREADS'],
+                                                thread_name_prefix='asgi-delegate')
+
+        # Commit count and a future resolved by the next commit, for the
+        # requests waiting on /tasks/changes
+        self.loop = None
+        self.generation = 0
+        self.changed = None
+        change_feed.subscribe(flask_app, self.on_commit)
+
+        self.handlers = {
+            'tasks.index': self.index,
+            'tasks.create_task': self.create_task,
+            'tasks.get_tasks': self.get_tasks,
+            'tasks.get_task_stats': self.get_task_stats,
+            'tasks.get_task_changes': self.get_task_changes,
+            'tasks.get_task': self.get_task,
+            'tasks.update_task': self.update_task,
+            'tasks.delete_task': self.delete_task,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+
+        environ = wsgi_environ(scope)
+        try:
+            rule, view_args = self.flask_app.url_map.bind_to_environ(environ).match(return_rule=True)
+        except HTTPException:
+            rule = None
+        # OPTIONS matches the first rule of the URL, whatever its method;
+        # Flask answers it with the Allow header instead
+        if rule is None or (scope['method'] == 'OPTIONS' and rule.provide_automatic_options):
+            handler = None
+        else:
+            handler = self.handlers.get(rule.endpoint)
+        if handler is None:
+            return await self.delegate(environ, receive, send)
+
+        environ['wsgi.input'] = io.BytesIO(await read_body(receive))
+        app = self.flask_app
+        with app.request_context(environ):
+            async with self.sessions() as session:
+                try:
+                    response = app.preprocess_request()
+                    if response is None:
+                        response = await handler(session, **view_args)
+                except Exception as e:
+                    try:
+                        response = app.handle_user_exception(e)
+                    except Exception as e:
+                        response = app.handle_exception(e)
+                response = app.process_response(app.make_response(response))
+                # Still inside the session, which an event stream goes on using
+                await self.send_response(response, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                self.delegate_pool.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def send_response(self, response, receive, send):
+        await send({'type': 'http.response.start', 'status': response.status_code,
+                    'headers': asgi_headers(response.headers.items())})
+        if not hasattr(response.response, '__aiter__'):
+            body = b'' if request.method == 'HEAD' else response.get_data()
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        # A stream ends at the next chunk after the client goes away
+        chunks = response.response
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            async for chunk in chunks:
+                if disconnected.done():
+                    break
+                await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+            await chunks.aclose()
+
+    async def delegate(self, environ, receive, send):
+        """Run a request through the Flask WSGI app on a thread of delegate_pool."""
+        loop = self.loop
+        messages = asyncio.Queue(maxsize=16)
+        gone = threading.Event()
+        environ['wsgi.input'] = io.BufferedReader(RequestBody(receive, loop))
+
+        def put(message):
+            if gone.is_set():
+                raise ClientGone
+            asyncio.run_coroutine_threadsafe(messages.put(message), loop).result()
+
+        def run():
+            try:
+                started = []
+                body = self.flask_app(environ, lambda status, headers, exc_info=None: started.append(
+                    (int(status.split(' ', 1)[0]), headers)))
+                try:
+                    status, headers = started[0]
+                    put({'type': 'http.response.start', 'status': status, 'headers': asgi_headers(headers)})
+                    for chunk in body:
+                        if chunk:
+                            put({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                    put({'type': 'http.response.body', 'body': b''})
+                finally:
+                    if hasattr(body, 'close'):
+                        body.close()
+            except ClientGone:
+                pass
+            except BaseException as e:
+                put(e)
+
+        loop.run_in_executor(self.delegate_pool, run)
+        try:
+            while True:
+                message = await messages.get()
+                if isinstance(message, BaseException):
+                    raise message
+                await send(message)
+                if message['type'] == 'http.response.body' and not message.get('more_body'):
+                    return
+        finally:
+            # Unblock a thread still producing a response nobody will read
+            gone.set()
+            while not messages.empty():
+                messages.get_nowait()
+
+    @asynccontextmanager
+    async def serialized_writes(self, session):
+        """Async counterpart of app.database.serialized_writes."""
+        if self.write_lock is None:
+            yield
+            return
+
+        async with self.write_lock:
+            token = _writing.set(True)
+            try:
+                yield
+            finally:
+                await session.rollback()
+                _writing.reset(token)
+
+    async def commit(self, session):
+        await session.commit()
+        cache.invalidate()
+        change_feed.notify()
+
+    def on_commit(self):
+        # Called on the committing thread, which may not be the loop's
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wake)
+
+    def wake(self):
+        self.generation += 1
+        if self.changed is not None:
+            self.changed.set_result(None)
+            self.changed = None
+
+    async def wait_for_commit(self, generation, timeout):
+        """Wait until a commit after `generation`, or timeout."""
+        if self.generation != generation:
+            return
+        if self.changed is None:
+            self.changed = self.loop.create_future()
+        try:
+            await asyncio.wait_for(asyncio.shield(self.changed), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    # Handlers for the routes of the same name in app.routes
+
+    async def index(self, session):
+        return jsonify({'message': 'Welcome to the Task Management API'})
+
+    @serialized_write
+    async def create_task(self, session):
+        data = request.get_json()
+        response = create_error(data)
+        if response is not None:
+            return response
+
+        task = new_task(data)
+        session.add(task)
+        await self.commit(session)
+        return created_response(task)
+
+    @cached
+    async def get_tasks(self, session):
+        try:
+            try:
+                statement, limit, sort_by, order = tasks_page_query(request.args)
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+
+            tasks = (await session.execute(statement)).all()
+            return jsonify(tasks_page(tasks, limit, sort_by, order))
+
+        except Exception as e:
+            return jsonify({
+                'message': 'An error occurred while processing your request',
+                'error': str(e)
+            }), 500
+
+    async def get_task_stats(self, session):
+        try:
+            query, upcoming_days = stats_query(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        summary = summarize(await session.execute(query), datetime.utcnow().date(), upcoming_days)
+        return jsonify(dict(summary, message='Task statistics retrieved successfully'))
+
+    async def fetch_changes(self, session, since, limit):
+        return [change_record(row) for row in await session.execute(changes_query(since, limit))]
+
+    async def wait_for_changes(self, session, since, limit, seconds):
+        deadline = time.monotonic() + seconds
+        recheck = current_app.config['TASKS_CHANGES_RECHECK_INTERVAL']
+        while True:
+            generation = self.generation
+            changes = await self.fetch_changes(session, since, limit)
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                return changes
+            await session.close()
+            await self.wait_for_commit(generation, min(remaining, recheck))
+
+    async def change_events(self, session, since, limit, seconds):
+        deadline = time.monotonic() + seconds
+        recheck = current_app.config['TASKS_CHANGES_RECHECK_INTERVAL']
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            changes = await self.wait_for_changes(session, since, limit, min(remaining, recheck))
+            if not changes:
+                yield ': keep-alive\n\n'
+                continue
+            for change in changes:
+                yield change_event(change)
+            since = changes[-1]['seq']
+
+    async def get_task_changes(self, session):
+        try:
+            since, wait, limit = parse_changes_request()
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        last_seq = await session.scalar(select(func.max(TaskChange.seq))) or 0
+        response = changes_position(since, last_seq)
+        if response is not None:
+            return response
+
+        if request.accept_mimetypes.best == 'text/event-stream':
+            seconds = current_app.config['TASKS_CHANGES_STREAM_SECONDS']
+            return Response(self.change_events(session, since, limit, seconds),
+                            mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+        changes = await self.wait_for_changes(session, since, limit + 1, wait)
+        return jsonify(changes_page(changes, since, limit))
+
+    @cached
+    async def get_task(self, session, id):
+        return task_response(await session.get(Task, id))
+
+    @serialized_write
+    async def update_task(self, session, id):
+        task = await session.get(Task, id)
+        data = request.get_json()
+        response = update_error(task, data)
+        if response is not None:
+            return response
+
+        apply_update(task, data)
+        await self.commit(session)
+        return updated_response(task)
+
+    @serialized_write
+    async def delete_task(self, session, id):
+        task = await session.get(Task, id)
+        if not task:
+            return task_not_found()
+        await session.delete(task)
+        await self.commit(session)
+        return deleted_response()
+
+
+def create_asgi_app(config_class=Config):
+    """Create the Flask app and wrap it for ASGI servers."""
+    if aiosqlite is None:
+        raise RuntimeError('The ASGI mode needs aiosqlite (pip install aiosqlite)')
+    return AsyncTaskApp(create_app(config_class))
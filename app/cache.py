@@ -0,0 +1,173 @@
+"""Response cache for task reads.
+
+Responses are stored under a key made of the task table version, the request
+path and its normalized query parameters. Every write bumps the version, so
+entries cached before it can never be served again and simply age out of the
+backend. Cached responses carry a strong ETag, which lets a poll whose
+If-None-Match still matches be answered with 304 without running a query or
+serializing anything.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, request
+
+
+class CacheBackend:
+    """Storage interface for the response cache.
+
+    get returns None on a miss. A backend shared between worker processes
+    also needs a shared version counter for invalidation to reach them.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        """Return a dict of backend counters such as size and evictions."""
+        return {}
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache bounded by entry count and time to live."""
+
+    def __init__(self, max_entries=1024, ttl=60, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'size': len(self._entries), 'evictions': self.evictions}
+
+
+class NullCache(CacheBackend):
+    """Backend that stores nothing, turning the response cache off."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+
+class ResponseCache:
+    """Flask extension caching GET responses for the task routes."""
+
+    def init_app(self, app):
+        factory = app.config['TASKS_CACHE_BACKEND']
+        if factory is None:
+            backend = MemoryCache(app.config['TASKS_CACHE_MAX_ENTRIES'], app.config['TASKS_CACHE_TTL'])
+        else:
+            backend = factory(app)
+        app.extensions['response_cache'] = {
+            'backend': backend,
+            'version': 0,
+            'hits': 0,
+            'misses': 0,
+            'lock': threading.Lock(),
+        }
+
+    @property
+    def state(self):
+        return current_app.extensions['response_cache']
+
+    def invalidate(self):
+        """Bump the table version after a write to tasks has committed."""
+        state = self.state
+        with state['lock']:
+            state['version'] += 1
+
+    def stats(self):
+        state = self.state
+        stats = {'hits': state['hits'], 'misses': state['misses'], 'version': state['version']}
+        stats.update(state['backend'].stats())
+        return stats
+
+    def make_key(self):
+        # Parameter order doesn't change the result, so it isn't part of the
+        # key. Empty values are: some are ignored, others are rejected
+        query = urlencode(sorted(request.args.items(multi=True)))
+        return f"{self.state['version']}:{request.path}?{query}"
+
+    def count(self, counter):
+        state = self.state
+        with state['lock']:
+            state[counter] += 1
+
+    def lookup(self, key):
+        """Return the cached response for key, or None on a miss."""
+        entry = self.state['backend'].get(key)
+        if entry is None:
+            self.count('misses')
+            return None
+        self.count('hits')
+        etag, body, mimetype = entry
+        response = current_app.response_class(body, mimetype=mimetype)
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    def store(self, key, response):
+        """Cache a successful response under key.
+
+        Take the key before running the view, so a write committed meanwhile
+        leaves the response under the old version.
+        """
+        if response.status_code != 200:
+            return response
+        body = response.get_data()
+        etag = hashlib.sha1(body).hexdigest()
+        self.state['backend'].set(key, (etag, body, response.mimetype))
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    def cached(self, view):
+        """Serve the view from the cache and answer If-None-Match with 304."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = self.make_key()
+            response = self.lookup(key)
+            if response is not None:
+                return response
+            return self.store(key, current_app.make_response(view(*args, **kwargs)))
+        return wrapper
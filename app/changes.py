@@ -0,0 +1,95 @@
+"""Change log behind GET /tasks/changes.
+
+Triggers on tasks append a row to task_changes for every insert, update and
+delete, in the same transaction as the write, so single, bulk and imported
+writes are all covered. seq is an AUTOINCREMENT key, so it only ever grows
+and is never reused, even after rows are removed.
+
+The log compacts itself as it is written. A task keeps only its latest
+change, so op is the last thing that happened to it and clients treat create
+and update alike, as upserts of the task sent with the change. Changes more
+than RETENTION sequence numbers behind the newest one are dropped, and a
+client whose position is older than that has to reload the task list.
+
+Requests waiting for changes are woken in-process whenever a session
+commits. Writes made by other processes are picked up when the waiters
+recheck, every TASKS_CHANGES_RECHECK_INTERVAL seconds.
+"""
+import threading
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+# Sequence numbers kept behind the newest change. The trim trigger is
+# created with this value, so changing it means recreating that trigger.
+RETENTION = 100000
+
+CHANGES_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS task_changes_insert AFTER INSERT ON tasks BEGIN "
+    "DELETE FROM task_changes WHERE task_id = new.id; "
+    "INSERT INTO task_changes (task_id, op, changed_at) VALUES (new.id, 'create', datetime('now')); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_update AFTER UPDATE ON tasks BEGIN "
+    "DELETE FROM task_changes WHERE task_id = new.id; "
+    "INSERT INTO task_changes (task_id, op, changed_at) VALUES (new.id, 'update', datetime('now')); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_delete AFTER DELETE ON tasks BEGIN "
+    "DELETE FROM task_changes WHERE task_id = old.id; "
+    "INSERT INTO task_changes (task_id, op, changed_at) VALUES (old.id, 'delete', datetime('now')); "
+    "END",
+]
+
+# Created along with task_changes rather than tasks
+TRIM_CHANGES_DDL = (
+    f"CREATE TRIGGER IF NOT EXISTS task_changes_trim AFTER INSERT ON task_changes BEGIN "
+    f"DELETE FROM task_changes WHERE seq <= new.seq - {RETENTION}; "
+    f"END"
+)
+
+
+def notify_waiters(session):
+    """Wake the requests waiting for changes after a commit."""
+    if has_app_context() and current_app.extensions.get('change_feed') is not None:
+        from app import change_feed
+        change_feed.notify()
+
+
+class ChangeFeed:
+    """Flask extension that wakes requests waiting for new changes."""
+
+    def init_app(self, app):
+        from app import db
+        app.extensions['change_feed'] = {'condition': threading.Condition(), 'generation': 0, 'subscribers': []}
+        if not event.contains(db.session, 'after_commit', notify_waiters):
+            event.listen(db.session, 'after_commit', notify_waiters)
+
+    @property
+    def state(self):
+        return current_app.extensions['change_feed']
+
+    def generation(self):
+        """Current commit count; read it before checking for changes."""
+        return self.state['generation']
+
+    def wait(self, generation, timeout):
+        """Block until a commit after `generation`, or timeout. Returns True on a commit."""
+        state = self.state
+        with state['condition']:
+            return state['condition'].wait_for(lambda: state['generation'] != generation, timeout)
+
+    def notify(self):
+        """Record a commit and wake the waiters.
+
+        Sessions from db.session call this on commit; other sessions, like
+        the async ones in app.asgi, call it themselves.
+        """
+        state = self.state
+        with state['condition']:
+            state['generation'] += 1
+            state['condition'].notify_all()
+        for callback in state['subscribers']:
+            callback()
+
+    def subscribe(self, app, callback):
+        """Also call callback, from the committing thread, after every commit."""
+        app.extensions['change_feed']['subscribers'].append(callback)
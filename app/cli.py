@@ -0,0 +1,97 @@
+import json
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app import cache, db
+from app.importer import InvalidEncoding, import_tasks
+from app.migrations import MigrationError, upgrade
+from app.search import rebuild_search_index
+from app.stats import rebuild_stats, stats_differences
+
+db_cli = AppGroup('db', help='Database maintenance commands.')
+tasks_cli = AppGroup('tasks', help='Task data commands.')
+
+
+@db_cli.command('upgrade')
+def upgrade_command():
+    """Create the database or apply pending schema migrations."""
+    try:
+        applied = upgrade()
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    if applied:
+        for name in applied:
+            click.echo(f'Applied migration: {name}')
+    else:
+        click.echo('Database is up to date')
+
+
+@tasks_cli.command('import')
+@click.argument('source', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']),
+              help='Input format. Defaults to csv for .csv files, otherwise ndjson.')
+@click.option('--batch-size', type=click.IntRange(min=1),
+              help='Rows per transaction. Defaults to TASKS_IMPORT_BATCH_SIZE.')
+@click.option('--errors', 'errors_path', type=click.Path(dir_okay=False),
+              help='File for rejected rows, one JSON object per line. '
+                   'Defaults to SOURCE.rejected.ndjson.')
+def import_command(source, fmt, batch_size, errors_path):
+    """Import tasks from an NDJSON or CSV file ('-' reads stdin)."""
+    name = source.name if isinstance(source.name, str) else '-'
+    if fmt is None:
+        fmt = 'csv' if name.lower().endswith('.csv') else 'ndjson'
+    batch_size = batch_size or current_app.config['TASKS_IMPORT_BATCH_SIZE']
+    if errors_path is None:
+        errors_path = 'rejected.ndjson' if name in ['-', '<stdin>'] else f'{name}.rejected.ndjson'
+
+    def on_progress(totals):
+        click.echo(f"{totals['imported']:,} imported, {totals['rejected']:,} rejected "
+                   f"({totals['rows_per_second']:,.0f} rows/s)", err=True)
+
+    with open(errors_path, 'w', encoding='utf-8') as errors_file:
+        def on_reject(record):
+            errors_file.write(json.dumps(record) + '\n')
+
+        try:
+            totals = import_tasks(source, fmt, batch_size, on_reject=on_reject, on_progress=on_progress)
+        except InvalidEncoding as e:
+            raise click.ClickException(f"{e}; stopped after importing {e.totals['imported']:,} tasks "
+                                       f"and rejecting {e.totals['rejected']:,} rows")
+
+    click.echo(f"Imported {totals['imported']:,} tasks in {totals['seconds']:.1f}s "
+               f"({totals['rows_per_second']:,.0f} rows/s)")
+    if totals['rejected']:
+        click.echo(f"Rejected {totals['rejected']:,} rows, see {errors_path}")
+    else:
+        os.remove(errors_path)
+
+
+@tasks_cli.command('reindex')
+def reindex_command():
+    """Rebuild the full-text search index from the tasks table."""
+    with db.engine.begin() as conn:
+        rebuild_search_index(conn)
+    cache.invalidate()
+    click.echo('Search index rebuilt')
+
+
+@tasks_cli.command('check-stats')
+@click.option('--rebuild', is_flag=True, help='Recompute the summary table from tasks.')
+def check_stats_command(rebuild):
+    """Compare the task_stats summary table with a full GROUP BY over tasks."""
+    with db.engine.begin() as conn:
+        if rebuild:
+            rebuild_stats(conn)
+            click.echo('Task statistics rebuilt')
+            return
+        differences = stats_differences(conn)
+
+    if not differences:
+        click.echo('Task statistics are consistent')
+        return
+    for category, priority, deadline_date, stored, actual in differences:
+        click.echo(f'{category} / {priority} / {deadline_date}: stored {stored}, actual {actual}')
+    raise click.ClickException(f'{len(differences)} groups differ, run with --rebuild to fix them')
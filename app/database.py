@@ -0,0 +1,85 @@
+"""SQLite engine setup and write serialization.
+
+SQLITE_PRAGMAS are applied to every new connection. With
+SQLITE_SERIALIZE_WRITES, writes from this process run one at a time under a
+lock and open their transaction with BEGIN IMMEDIATE. The write lock is then
+taken up front rather than by upgrading a read transaction part way through,
+which is what makes concurrent writers fail with "database is locked"
+instead of waiting for each other.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app
+from sqlalchemy import event
+
+from app import db
+
+# Set while the current thread holds the write lock
+_writing = ContextVar('sqlite_writing', default=False)
+
+
+def configure_engine(app):
+    """Install the connection hooks for the app's engine."""
+    app.extensions['sqlite_write_lock'] = threading.RLock() if app.config['SQLITE_SERIALIZE_WRITES'] else None
+    if not app.config['SQLITE_PRAGMAS'] and not app.config['SQLITE_SERIALIZE_WRITES']:
+        return
+
+    with app.app_context():
+        install_hooks(db.engine, app.config)
+
+
+def install_hooks(engine, config):
+    """Apply SQLITE_PRAGMAS and SQLITE_SERIALIZE_WRITES to a (sync) engine.
+
+    Also used for the sync_engine of the async engine in app.asgi.
+    """
+    pragmas = config['SQLITE_PRAGMAS']
+    serialize = config['SQLITE_SERIALIZE_WRITES']
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        if serialize:
+            # Stop pysqlite from issuing its own BEGIN, so on_begin decides
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    if serialize:
+        @event.listens_for(engine, 'begin')
+        def on_begin(conn):
+            conn.exec_driver_sql('BEGIN IMMEDIATE' if _writing.get() else 'BEGIN')
+
+
+@contextmanager
+def serialized_writes():
+    """Hold the app's write lock for the writes made inside the block.
+
+    The block should commit its changes; anything left uncommitted, such as
+    after an error, is rolled back before the lock is released.
+    """
+    lock = current_app.extensions['sqlite_write_lock']
+    if lock is None:
+        yield
+        return
+
+    with lock:
+        token = _writing.set(True)
+        try:
+            yield
+        finally:
+            db.session.rollback()
+            _writing.reset(token)
+
+
+def serialized_write(view):
+    """Run a view that writes to the database under serialized_writes."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with serialized_writes():
+            return view(*args, **kwargs)
+    return wrapper
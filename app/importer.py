@@ -0,0 +1,238 @@
+"""Streaming import of task files in NDJSON or CSV format.
+
+Files are parsed one record at a time and written in batches, each validated
+in one TaskSchema pass and inserted in its own transaction, so memory use is
+bounded by the batch size rather than the size of the file.
+"""
+import csv
+import json
+import time
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import insert
+
+from app import cache, db
+from app.database import serialized_writes
+from app.models import PRIORITY_RANKS, Task, category_ids
+from app.schemas import tasks_schema
+from app.utils import ISO_DATETIME, parse_datetime
+
+TASK_FIELDS = ['title', 'description', 'category', 'priority', 'deadline']
+TASK_FIELD_SET = frozenset(TASK_FIELDS)
+REQUIRED_FIELDS = frozenset(['title', 'category', 'priority', 'deadline'])
+
+# Written by GET /tasks/export; dropped so exported files can be imported again
+EXPORT_ONLY_FIELDS = ['id', 'created_at', 'updated_at']
+
+
+def plain_row(item, partial=False):
+    """Return the column dict of an item TaskSchema certainly accepts, else None.
+
+    Checks in plain Python what the schema would for the common case: a dict
+    of TASK_FIELDS holding strings, a known priority and a zero-padded
+    deadline. Anything else, valid or not, returns None and is left to the
+    schema, which also words the errors.
+    """
+    if type(item) is not dict or not item.keys() <= TASK_FIELD_SET:
+        return None
+    if not partial and not item.keys() >= REQUIRED_FIELDS:
+        return None
+    row = dict(item)
+    if 'title' in row and (type(row['title']) is not str or not row['title']):
+        return None
+    if 'description' in row and row['description'] is not None and type(row['description']) is not str:
+        return None
+    if 'category' in row and type(row['category']) is not str:
+        return None
+    if 'priority' in row and (type(row['priority']) is not str or row['priority'] not in PRIORITY_RANKS):
+        return None
+    if 'deadline' in row:
+        deadline = row['deadline']
+        # The schema parses deadlines with fromisoformat, which accepts
+        # every string ISO_DATETIME matches that parse_datetime does
+        if type(deadline) is not str or not ISO_DATETIME.fullmatch(deadline):
+            return None
+        try:
+            row['deadline'] = parse_datetime(deadline)
+        except ValueError:
+            return None
+    return row
+
+
+def validate_tasks(items, partial=False):
+    """Validate items against TaskSchema and build their column dicts.
+
+    Items plain_row accepts skip marshmallow's per-field machinery; the rest
+    are validated in one TaskSchema pass. Returns (rows, errors), both keyed
+    by the item's index in items, with rows in item order.
+    """
+    rows, rest = {}, []
+    for index, item in enumerate(items):
+        row = plain_row(item, partial)
+        if row is None:
+            rest.append(index)
+        else:
+            rows[index] = row
+    if not rest:
+        return rows, {}
+
+    schema_errors = tasks_schema.validate([items[index] for index in rest], partial=partial)
+    errors = {}
+    for position, index in enumerate(rest):
+        if position in schema_errors:
+            errors[index] = schema_errors[position]
+            continue
+        item = items[index]
+        row = {field: item[field] for field in TASK_FIELDS if field in item}
+        if 'deadline' in row:
+            try:
+                row['deadline'] = parse_datetime(row['deadline'])
+            except ValueError as e:
+                errors[index] = {'deadline': [str(e)]}
+                continue
+        rows[index] = row
+    return dict(sorted(rows.items())), errors
+
+
+def resolve_categories(rows):
+    """Replace the category names in rows from validate_tasks with category_id.
+
+    Categories not stored yet are added, so call this inside the write.
+    """
+    ids = category_ids(db.session, [row['category'] for row in rows if 'category' in row])
+    for row in rows:
+        if 'category' in row:
+            row['category_id'] = ids[row.pop('category')]
+    return rows
+
+
+def insert_tasks(rows):
+    """Insert rows from resolve_categories and return their ids, in order.
+
+    Asking for RETURNING makes SQLAlchemy send the rows as multi-row INSERT
+    statements (insertmanyvalues) instead of one statement per row. With
+    triggers on tasks every statement opens a statement journal that copies
+    each page the row touches, so that saves most of the write. The insert
+    goes through the table rather than the ORM, and the whole batch shares
+    one created_at, which skips the per-row defaults and bookkeeping.
+    """
+    now = datetime.utcnow()
+    for row in rows:
+        # Consecutive rows with the same keys share a statement
+        row.setdefault('description', None)
+        row['created_at'] = row['updated_at'] = now
+    table = Task.__table__
+    ids = db.session.scalars(insert(table).returning(table.c.id), rows).all()
+    # RETURNING's order is arbitrary, but rowids are assigned in insertion order
+    return sorted(ids)
+
+
+class InvalidEncoding(ValueError):
+    """Raised by import_tasks at the first line that is not valid UTF-8.
+
+    Batches before it stay committed; totals holds what they imported and
+    rejected.
+    """
+
+    def __init__(self, line):
+        super().__init__(f'Line {line} is not valid UTF-8')
+        self.line = line
+        self.totals = None
+
+
+def decode_lines(stream):
+    """Yield the lines of a binary stream as text, keeping their line endings."""
+    for line_number, line in enumerate(stream, start=1):
+        try:
+            yield line.decode('utf-8')
+        except UnicodeDecodeError:
+            raise InvalidEncoding(line_number) from None
+
+
+def read_ndjson(text):
+    """Yield (line, item, error) for each non-blank line of an NDJSON stream."""
+    for line_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            yield line_number, line, {'_schema': [f'Invalid JSON: {e}']}
+
+
+def read_csv(text):
+    """Yield (line, item, error) for each row of a CSV stream with a header."""
+    reader = csv.DictReader(text)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, row.pop(None), {'_schema': ['Row has more fields than the header.']}
+            continue
+        # CSV has no null, so an empty description means none
+        if row.get('description') == '':
+            row['description'] = None
+        yield reader.line_num, row, None
+
+
+def import_tasks(stream, fmt, batch_size, on_reject=None, on_progress=None):
+    """Import tasks from a binary NDJSON or CSV stream.
+
+    on_reject is called with a dict holding the line number, the rejected row
+    and its errors. on_progress is called with the running totals after every
+    batch. Returns the final totals: imported, rejected, seconds and
+    rows_per_second. Raises InvalidEncoding at a line that isn't UTF-8.
+    """
+    # Decoded line by line, so a bad byte is reported at its own line
+    text = decode_lines(stream)
+    records = read_csv(text) if fmt == 'csv' else read_ndjson(text)
+    totals = {'imported': 0, 'rejected': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+    start = time.perf_counter()
+
+    def reject(line_number, row, errors):
+        totals['rejected'] += 1
+        if on_reject:
+            on_reject({'line': line_number, 'row': row, 'errors': errors})
+
+    while True:
+        batch, invalid = [], None
+        try:
+            for record in islice(records, batch_size):
+                batch.append(record)
+        except InvalidEncoding as e:
+            invalid = e
+        if not batch and invalid is None:
+            break
+
+        items, line_numbers = [], []
+        for line_number, item, error in batch:
+            if error:
+                reject(line_number, item, error)
+                continue
+            if isinstance(item, dict):
+                item = {k: v for k, v in item.items() if k not in EXPORT_ONLY_FIELDS}
+            items.append(item)
+            line_numbers.append(line_number)
+
+        rows, errors = validate_tasks(items)
+        for index, item_errors in sorted(errors.items()):
+            reject(line_numbers[index], items[index], item_errors)
+        if rows:
+            with serialized_writes():
+                insert_tasks(resolve_categories(list(rows.values())))
+                db.session.commit()
+            cache.invalidate()
+            totals['imported'] += len(rows)
+
+        totals['seconds'] = time.perf_counter() - start
+        totals['rows_per_second'] = (totals['imported'] + totals['rejected']) / totals['seconds']
+        if invalid is not None:
+            invalid.totals = dict(totals)
+            raise invalid
+        if on_progress:
+            on_progress(dict(totals))
+
+    totals['seconds'] = time.perf_counter() - start
+    if totals['seconds']:
+        totals['rows_per_second'] = (totals['imported'] + totals['rejected']) / totals['seconds']
+    return totals
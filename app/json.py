@@ -0,0 +1,39 @@
+"""Optional orjson-backed JSON provider.
+
+orjson is not a hard dependency. When it is installed and ORJSON_PROVIDER is
+enabled, create_app installs ORJSONProvider, which produces the same bytes as
+Flask's default provider and falls back to it whenever orjson can't match
+them: any dumps arguments other than the compact separators response() passes
+(indented output in debug mode, json's default ', ' separators in direct
+dumps calls, sort_keys and the like), non-ASCII text and DEL characters (the
+default escapes them), and values orjson doesn't handle. Floats are not
+checked, as orjson writes large exponents differently (1e16, not 1e+16).
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# The only dumps arguments orjson's output matches; response() passes these
+COMPACT = {'separators': (',', ':')}
+
+
+class ORJSONProvider(DefaultJSONProvider):
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs != COMPACT or not self.sort_keys:
+            return super().dumps(obj, **kwargs)
+
+        try:
+            # Datetimes are passed to default so they keep Flask's HTTP date format
+            data = orjson.dumps(obj, default=self.default,
+                                option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+        # The default provider escapes everything outside printable ASCII
+        if not data.isascii() or b'\x7f' in data:
+            return super().dumps(obj, **kwargs)
+        return data.decode('ascii')
@@ -0,0 +1,218 @@
+"""Opt-in request instrumentation.
+
+With METRICS_ENABLED, every request records how many SQL statements it ran
+and how long they took (from SQLAlchemy cursor events), the time spent
+serializing responses, and the total handler time. These are sent back in a
+Server-Timing header and aggregated per route for the Prometheus text format
+served at /metrics. Statements slower than METRICS_SLOW_QUERY_MS, and
+statements a single request runs METRICS_N_PLUS_ONE_THRESHOLD times or more
+(the usual sign of a query issued per item in a loop), are logged and
+counted.
+
+When disabled no hooks or events are installed; the only cost left is the
+check in Metrics.timed. Queries run while a streamed body is written happen
+after the response headers are sent, so they are not part of the numbers.
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import Response, current_app, request
+from sqlalchemy import event
+
+# RequestMetrics for the request being handled, when instrumentation is on
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.statements = Counter()
+        self.phases = defaultdict(float)
+        self.slow_queries = 0
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+def labels(**values):
+    pairs = ','.join(f'{key}="{value}"' for key, value in values.items())
+    return '{' + pairs + '}'
+
+
+class Metrics:
+    """Flask extension recording per-request query and timing metrics."""
+
+    def init_app(self, app):
+        app.extensions['metrics'] = None
+        if not app.config['METRICS_ENABLED']:
+            return
+
+        state = app.extensions['metrics'] = {
+            'lock': threading.Lock(),
+            'latency': {},
+            'requests': Counter(),
+            'queries': Counter(),
+            'db_seconds': Counter(),
+            'serialize_seconds': Counter(),
+            'slow_queries': Counter(),
+            'n_plus_one': Counter(),
+        }
+        repeats = app.config['METRICS_N_PLUS_ONE_THRESHOLD']
+        buckets = tuple(app.config['METRICS_BUCKETS'])
+
+        from app import db
+        with app.app_context():
+            self.instrument(app, db.engine)
+
+        # Time the JSON encoding of every response as serialization
+        provider_dumps = app.json.dumps
+
+        def dumps(obj, **kwargs):
+            with self.timed('serialize'):
+                return provider_dumps(obj, **kwargs)
+        app.json.dumps = dumps
+
+        @app.before_request
+        def start_request():
+            if request.endpoint != 'metrics':
+                _current.set(RequestMetrics())
+
+        @app.after_request
+        def finish_request(response):
+            current = _current.get()
+            if current is None:
+                return response
+            handler = time.perf_counter() - current.started
+            db_time = current.phases['db']
+            serialize = current.phases['serialize']
+            response.headers['Server-Timing'] = (
+                f'db;dur={db_time * 1000:.2f};desc="{current.queries} queries", '
+                f'serialize;dur={serialize * 1000:.2f}, '
+                f'handler;dur={handler * 1000:.2f}'
+            )
+
+            route = request.url_rule.rule if request.url_rule else '<unmatched>'
+            repeated = [(statement, count) for statement, count in current.statements.items() if count >= repeats]
+            for statement, count in repeated:
+                current_app.logger.warning('Possible N+1: %s %s ran a statement %d times: %s',
+                                           request.method, request.path, count, statement)
+
+            key = (request.method, route)
+            with state['lock']:
+                if key not in state['latency']:
+                    state['latency'][key] = Histogram(buckets)
+                state['latency'][key].observe(handler)
+                state['requests'][key + (response.status_code,)] += 1
+                state['queries'][key] += current.queries
+                state['db_seconds'][key] += db_time
+                state['serialize_seconds'][key] += serialize
+                state['slow_queries'][key] += current.slow_queries
+                state['n_plus_one'][key] += bool(repeated)
+            return response
+
+        @app.teardown_request
+        def end_request(exc):
+            _current.set(None)
+
+        app.add_url_rule('/metrics', 'metrics', self.export)
+
+    def instrument(self, app, engine):
+        """Count and time the statements run on a (sync) engine.
+
+        Also used for the sync_engine of the async engine in app.asgi.
+        """
+        slow_query = app.config['METRICS_SLOW_QUERY_MS'] / 1000
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['metrics_started'].pop()
+            current = _current.get()
+            if current is None:
+                return
+            current.queries += 1
+            current.statements[statement] += 1
+            current.phases['db'] += elapsed
+            if elapsed >= slow_query:
+                current.slow_queries += 1
+                current_app.logger.warning('Slow query (%.1f ms) in %s %s: %s',
+                                           elapsed * 1000, request.method, request.path, statement)
+
+    @contextmanager
+    def timed(self, phase):
+        """Add the time spent in the block to the current request's phase."""
+        current = _current.get()
+        if current is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            current.phases[phase] += time.perf_counter() - started
+
+    def export(self):
+        """Render the collected metrics in the Prometheus text format."""
+        state = current_app.extensions['metrics']
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with state['lock']:
+            family('http_request_duration_seconds', 'histogram', 'Time to handle a request, by route.')
+            for (method, route), histogram in sorted(state['latency'].items()):
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'http_request_duration_seconds_bucket'
+                                 f'{labels(method=method, route=route, le=bound)} {count}')
+                lines.append(f'http_request_duration_seconds_bucket'
+                             f'{labels(method=method, route=route, le="+Inf")} {histogram.count}')
+                lines.append(f'http_request_duration_seconds_sum{labels(method=method, route=route)} '
+                             f'{histogram.sum:.6f}')
+                lines.append(f'http_request_duration_seconds_count{labels(method=method, route=route)} '
+                             f'{histogram.count}')
+
+            family('http_requests_total', 'counter', 'Requests handled, by route and status.')
+            for (method, route, status), count in sorted(state['requests'].items()):
+                lines.append(f'http_requests_total{labels(method=method, route=route, status=status)} {count}')
+
+            for name, key, kind, help_text in [
+                ('db_queries_total', 'queries', 'counter', 'SQL statements executed, by route.'),
+                ('db_query_seconds_total', 'db_seconds', 'counter', 'Time spent executing SQL, by route.'),
+                ('serialization_seconds_total', 'serialize_seconds', 'counter',
+                 'Time spent serializing responses, by route.'),
+                ('db_slow_queries_total', 'slow_queries', 'counter',
+                 'Statements slower than METRICS_SLOW_QUERY_MS, by route.'),
+                ('db_n_plus_one_requests_total', 'n_plus_one', 'counter',
+                 'Requests that repeated a statement METRICS_N_PLUS_ONE_THRESHOLD times or more, by route.'),
+            ]:
+                family(name, kind, help_text)
+                for (method, route), value in sorted(state[key].items()):
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{labels(method=method, route=route)} {value}')
+
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
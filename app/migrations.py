@@ -0,0 +1,423 @@
+"""Schema migrations for existing SQLite databases.
+
+db.create_all() only creates missing tables, so schema changes to tables that
+already exist in a deployed database (such as instance/tasks.db) are applied
+here instead. Migrations run in order, once each, and the number applied is
+tracked in SQLite's PRAGMA user_version. Migrations are written against the
+schema as it was when they were added, so they must not import the models.
+Most run in one transaction; those marked online run their own, shorter
+ones.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import inspect
+
+from app import db
+from app.database import _writing
+
+
+def add_task_indexes(conn):
+    """Add the composite filter/sort indexes on tasks."""
+    indexes = {
+        'ix_tasks_title': 'title',
+        'ix_tasks_category': 'category',
+        'ix_tasks_priority': 'priority',
+        'ix_tasks_deadline': 'deadline',
+        'ix_tasks_created_at': 'created_at',
+        'ix_tasks_category_title': 'category, title',
+        'ix_tasks_category_priority': 'category, priority',
+        'ix_tasks_category_deadline': 'category, deadline',
+        'ix_tasks_category_created_at': 'category, created_at',
+        'ix_tasks_priority_title': 'priority, title',
+        'ix_tasks_priority_category': 'priority, category',
+        'ix_tasks_priority_deadline': 'priority, deadline',
+        'ix_tasks_priority_created_at': 'priority, created_at',
+        'ix_tasks_category_priority_title': 'category, priority, title',
+        'ix_tasks_category_priority_deadline': 'category, priority, deadline',
+        'ix_tasks_category_priority_created_at': 'category, priority, created_at',
+    }
+    for name, columns in indexes.items():
+        conn.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS {name} ON tasks ({columns})')
+
+
+def add_task_search(conn):
+    """Add the tasks_fts full-text index, its sync triggers, and index existing rows."""
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts "
+        "USING fts5(title, description, content='tasks', content_rowid='id')"
+    )
+    create_search_triggers(conn)
+    conn.exec_driver_sql("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def create_search_triggers(conn):
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+        "INSERT INTO tasks_fts (tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+        "INSERT INTO tasks_fts (tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description); "
+        "END"
+    )
+
+
+def add_task_stats(conn):
+    """Add the task_stats summary table and its triggers, and fill it from tasks."""
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS task_stats ("
+        "category VARCHAR(50) NOT NULL, priority VARCHAR(10) NOT NULL, deadline_date DATE NOT NULL, "
+        "task_count INTEGER NOT NULL, PRIMARY KEY (category, priority, deadline_date))"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS task_stats_insert AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO task_stats (category, priority, deadline_date, task_count) "
+        "VALUES (new.category, new.priority, date(new.deadline), 1) "
+        "ON CONFLICT (category, priority, deadline_date) DO UPDATE SET task_count = task_count + 1; "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS task_stats_delete AFTER DELETE ON tasks BEGIN "
+        "UPDATE task_stats SET task_count = task_count - 1 "
+        "WHERE category = old.category AND priority = old.priority AND deadline_date = date(old.deadline); "
+        "DELETE FROM task_stats WHERE task_count <= 0 "
+        "AND category = old.category AND priority = old.priority AND deadline_date = date(old.deadline); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS task_stats_update AFTER UPDATE OF category, priority, deadline ON tasks "
+        "WHEN old.category IS NOT new.category OR old.priority IS NOT new.priority "
+        "OR date(old.deadline) IS NOT date(new.deadline) BEGIN "
+        "UPDATE task_stats SET task_count = task_count - 1 "
+        "WHERE category = old.category AND priority = old.priority AND deadline_date = date(old.deadline); "
+        "DELETE FROM task_stats WHERE task_count <= 0 "
+        "AND category = old.category AND priority = old.priority AND deadline_date = date(old.deadline); "
+        "INSERT INTO task_stats (category, priority, deadline_date, task_count) "
+        "VALUES (new.category, new.priority, date(new.deadline), 1) "
+        "ON CONFLICT (category, priority, deadline_date) DO UPDATE SET task_count = task_count + 1; "
+        "END"
+    )
+    conn.exec_driver_sql("DELETE FROM task_stats")
+    conn.exec_driver_sql(
+        "INSERT INTO task_stats (category, priority, deadline_date, task_count) "
+        "SELECT category, priority, date(deadline), count(*) FROM tasks "
+        "GROUP BY category, priority, date(deadline)"
+    )
+
+
+def add_task_changes(conn):
+    """Add the task_changes log and the triggers that write it."""
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS task_changes ("
+        "seq INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, task_id INTEGER NOT NULL, "
+        "op VARCHAR(10) NOT NULL, changed_at DATETIME NOT NULL)"
+    )
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_task_changes_task_id ON task_changes (task_id)")
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS task_changes_insert AFTER INSERT ON tasks BEGIN "
+        "DELETE FROM task_changes WHERE task_id = new.id; "
+        "INSERT INTO task_changes (task_id, op, changed_at) VALUES (new.id, 'create', datetime('now')); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS task_changes_update AFTER UPDATE ON tasks BEGIN "
+        "DELETE FROM task_changes WHERE task_id = new.id; "
+        "INSERT INTO task_changes (task_id, op, changed_at) VALUES (new.id, 'update', datetime('now')); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS task_changes_delete AFTER DELETE ON tasks BEGIN "
+        "DELETE FROM task_changes WHERE task_id = old.id; "
+        "INSERT INTO task_changes (task_id, op, changed_at) VALUES (old.id, 'delete', datetime('now')); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS task_changes_trim AFTER INSERT ON task_changes BEGIN "
+        "DELETE FROM task_changes WHERE seq <= new.seq - 100000; "
+        "END"
+    )
+
+
+def online(migration):
+    """Mark a migration that takes the engine and runs its own short transactions.
+
+    The database stays usable while it runs, so it must cope with concurrent
+    writes, and with being run again after an interruption.
+    """
+    migration.online = True
+    return migration
+
+
+class MigrationError(Exception):
+    """A migration found data it can't convert; nothing has been changed."""
+
+
+@contextmanager
+def write_transaction(engine):
+    """Connection in a transaction that holds SQLite's write lock from the start.
+
+    pysqlite only opens a transaction of its own before INSERT, UPDATE and
+    DELETE, so DDL under a plain engine.begin() commits statement by
+    statement. With install_hooks the begin event already issues BEGIN
+    IMMEDIATE; otherwise it is issued here.
+    """
+    with engine.connect() as conn:
+        token = _writing.set(True)
+        try:
+            with conn.begin():
+                if not conn.connection.driver_connection.in_transaction:
+                    conn.exec_driver_sql('BEGIN IMMEDIATE')
+                yield conn
+        finally:
+            _writing.reset(token)
+
+
+# Rows copied per transaction by normalize_categories_and_priority
+BACKFILL_BATCH_SIZE = 5000
+
+# Most offending rows listed by a MigrationError
+MAX_REPORTED_ROWS = 20
+
+TASK_COPY_COLUMNS = 'id, title, description, category_id, priority, deadline, created_at, updated_at'
+
+
+def task_copy_values(row):
+    """SELECT list mapping an old-schema tasks row (as `row`) to TASK_COPY_COLUMNS.
+
+    The old priority column took any string, so names are matched ignoring
+    case and surrounding spaces; anything else maps to NULL, which the
+    NOT NULL on tasks_new.priority rejects.
+    """
+    return (
+        f"{row}.id, {row}.title, {row}.description, "
+        f"(SELECT id FROM categories WHERE name = {row}.category), "
+        f"CASE lower(trim({row}.priority)) WHEN 'low' THEN 1 WHEN 'medium' THEN 2 WHEN 'high' THEN 3 END, "
+        f"{row}.deadline, {row}.created_at, {row}.updated_at"
+    )
+
+
+@online
+def normalize_categories_and_priority(engine):
+    """Store categories in a lookup table and priorities as ranks (Low = 1).
+
+    tasks is rebuilt as tasks_new with category_id and an integer priority.
+    Existing rows are copied in batches of BACKFILL_BATCH_SIZE, each its own
+    transaction, while triggers on tasks copy every concurrent write across,
+    so processes still running the old code keep serving and are only held
+    up for one batch at a time. The tables are then swapped, and the
+    indexes, triggers and task_stats rebuilt, in a last short transaction;
+    from then on only the new code works against the database.
+
+    Raises MigrationError, before changing anything, if a task's priority
+    isn't one of Low, Medium or High in any case. Concurrent writes of such
+    a priority fail in the mirror triggers rather than being dropped.
+    """
+    with write_transaction(engine) as conn:
+        if 'category_id' in {column['name'] for column in inspect(conn).get_columns('tasks')}:
+            return
+        invalid = conn.exec_driver_sql(
+            "SELECT id, priority FROM tasks "
+            "WHERE priority IS NULL OR lower(trim(priority)) NOT IN ('low', 'medium', 'high') "
+            "ORDER BY id LIMIT ?", (MAX_REPORTED_ROWS,)
+        ).all()
+        if invalid:
+            rows = ', '.join(f'{id} ({priority!r})' for id, priority in invalid)
+            raise MigrationError(f'Tasks with a priority other than Low, Medium or High, fix them and '
+                                 f'run the upgrade again: {rows}')
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS categories (id INTEGER NOT NULL, name VARCHAR(50) NOT NULL, "
+            "PRIMARY KEY (id), UNIQUE (name))"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS tasks_new (id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, "
+            "description TEXT, category_id INTEGER NOT NULL, priority SMALLINT NOT NULL, "
+            "deadline DATETIME NOT NULL, created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id), "
+            "FOREIGN KEY(category_id) REFERENCES categories (id))"
+        )
+        # Upserts only resolve conflicts on the key, so a row that breaks
+        # any other constraint fails the statement instead of being skipped
+        conn.exec_driver_sql(
+            "INSERT INTO categories (name) SELECT DISTINCT category FROM tasks WHERE true "
+            "ON CONFLICT (name) DO NOTHING"
+        )
+        copied_columns = ', '.join(f'{column} = excluded.{column}' for column in TASK_COPY_COLUMNS.split(', ')[1:])
+        for event in ('INSERT', 'UPDATE'):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS tasks_migrate_{event.lower()} AFTER {event} ON tasks BEGIN "
+                f"INSERT INTO categories (name) VALUES (new.category) ON CONFLICT (name) DO NOTHING; "
+                f"INSERT INTO tasks_new ({TASK_COPY_COLUMNS}) SELECT {task_copy_values('new')} WHERE true "
+                f"ON CONFLICT (id) DO UPDATE SET {copied_columns}; "
+                f"END"
+            )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS tasks_migrate_delete AFTER DELETE ON tasks BEGIN "
+            "DELETE FROM tasks_new WHERE id = old.id; "
+            "END"
+        )
+
+    # Rows already copied by the triggers are newer, so keep them
+    last_id = -1
+    while True:
+        with write_transaction(engine) as conn:
+            batch_end = conn.exec_driver_sql(
+                "SELECT max(id) FROM (SELECT id FROM tasks WHERE id > ? ORDER BY id LIMIT ?)",
+                (last_id, BACKFILL_BATCH_SIZE)
+            ).scalar()
+            if batch_end is None:
+                break
+            conn.exec_driver_sql(
+                f"INSERT INTO tasks_new ({TASK_COPY_COLUMNS}) "
+                f"SELECT {task_copy_values('tasks')} FROM tasks WHERE id > ? AND id <= ? "
+                f"ON CONFLICT (id) DO NOTHING",
+                (last_id, batch_end)
+            )
+            last_id = batch_end
+
+    with write_transaction(engine) as conn:
+        # Every task must have been copied before the old table goes
+        missing = conn.exec_driver_sql(
+            "SELECT id FROM tasks WHERE id NOT IN (SELECT id FROM tasks_new) ORDER BY id LIMIT ?",
+            (MAX_REPORTED_ROWS,)
+        ).scalars().all()
+        if missing:
+            raise MigrationError(f'Tasks missing from tasks_new, not swapping the tables: {missing}')
+
+        # Dropping tasks drops its indexes and every trigger on it
+        conn.exec_driver_sql("DROP TABLE tasks")
+        conn.exec_driver_sql("ALTER TABLE tasks_new RENAME TO tasks")
+        indexes = {
+            'ix_tasks_title': 'title',
+            'ix_tasks_category': 'category_id',
+            'ix_tasks_priority': 'priority',
+            'ix_tasks_deadline': 'deadline',
+            'ix_tasks_created_at': 'created_at',
+            'ix_tasks_category_title': 'category_id, title',
+            'ix_tasks_category_priority': 'category_id, priority',
+            'ix_tasks_category_deadline': 'category_id, deadline',
+            'ix_tasks_category_created_at': 'category_id, created_at',
+            'ix_tasks_priority_title': 'priority, title',
+            'ix_tasks_priority_category': 'priority, category_id',
+            'ix_tasks_priority_deadline': 'priority, deadline',
+            'ix_tasks_priority_created_at': 'priority, created_at',
+            'ix_tasks_category_priority_title': 'category_id, priority, title',
+            'ix_tasks_category_priority_deadline': 'category_id, priority, deadline',
+            'ix_tasks_category_priority_created_at': 'category_id, priority, created_at',
+        }
+        for name, columns in indexes.items():
+            conn.exec_driver_sql(f'CREATE INDEX {name} ON tasks ({columns})')
+
+        # Row ids are unchanged, so tasks_fts stays valid and only needs its triggers
+        create_search_triggers(conn)
+        # Only the triggers are missing; the table and its index are kept
+        add_task_changes(conn)
+
+        conn.exec_driver_sql("DROP TABLE task_stats")
+        conn.exec_driver_sql(
+            "CREATE TABLE task_stats (category_id INTEGER NOT NULL, priority SMALLINT NOT NULL, "
+            "deadline_date DATE NOT NULL, task_count INTEGER NOT NULL, "
+            "PRIMARY KEY (category_id, priority, deadline_date), "
+            "FOREIGN KEY(category_id) REFERENCES categories (id))"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER task_stats_insert AFTER INSERT ON tasks BEGIN "
+            "INSERT INTO task_stats (category_id, priority, deadline_date, task_count) "
+            "VALUES (new.category_id, new.priority, date(new.deadline), 1) "
+            "ON CONFLICT (category_id, priority, deadline_date) DO UPDATE SET task_count = task_count + 1; "
+            "END"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER task_stats_delete AFTER DELETE ON tasks BEGIN "
+            "UPDATE task_stats SET task_count = task_count - 1 "
+            "WHERE category_id = old.category_id AND priority = old.priority "
+            "AND deadline_date = date(old.deadline); "
+            "DELETE FROM task_stats WHERE task_count <= 0 "
+            "AND category_id = old.category_id AND priority = old.priority "
+            "AND deadline_date = date(old.deadline); "
+            "END"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER task_stats_update AFTER UPDATE OF category_id, priority, deadline ON tasks "
+            "WHEN old.category_id IS NOT new.category_id OR old.priority IS NOT new.priority "
+            "OR date(old.deadline) IS NOT date(new.deadline) BEGIN "
+            "UPDATE task_stats SET task_count = task_count - 1 "
+            "WHERE category_id = old.category_id AND priority = old.priority "
+            "AND deadline_date = date(old.deadline); "
+            "DELETE FROM task_stats WHERE task_count <= 0 "
+            "AND category_id = old.category_id AND priority = old.priority "
+            "AND deadline_date = date(old.deadline); "
+            "INSERT INTO task_stats (category_id, priority, deadline_date, task_count) "
+            "VALUES (new.category_id, new.priority, date(new.deadline), 1) "
+            "ON CONFLICT (category_id, priority, deadline_date) DO UPDATE SET task_count = task_count + 1; "
+            "END"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO task_stats (category_id, priority, deadline_date, task_count) "
+            "SELECT category_id, priority, date(deadline), count(*) FROM tasks "
+            "GROUP BY category_id, priority, date(deadline)"
+        )
+
+
+def drop_priority_category_index(conn):
+    """Drop ix_tasks_priority_category, which ix_tasks_category_priority covers."""
+    conn.exec_driver_sql('DROP INDEX IF EXISTS ix_tasks_priority_category')
+
+
+MIGRATIONS = [
+    add_task_indexes,
+    add_task_search,
+    add_task_stats,
+    add_task_changes,
+    normalize_categories_and_priority,
+    drop_priority_category_index,
+]
+
+
+def schema_version(conn):
+    return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+
+def stamp(conn, version):
+    conn.exec_driver_sql(f'PRAGMA user_version = {int(version)}')
+
+
+def upgrade(engine=None):
+    """Create or upgrade the database to the current schema.
+
+    A database without a tasks table is created from the models and stamped
+    as fully migrated. Returns the names of the migrations that were applied.
+    """
+    engine = engine or db.engine
+    applied = []
+    with engine.begin() as conn:
+        if not inspect(conn).has_table('tasks'):
+            db.metadata.create_all(conn)
+            stamp(conn, len(MIGRATIONS))
+            return applied
+        version = schema_version(conn)
+
+    # Each migration commits along with its version stamp
+    for migration in MIGRATIONS[version:]:
+        if getattr(migration, 'online', False):
+            migration(engine)
+            with engine.begin() as conn:
+                stamp(conn, version + 1)
+        else:
+            with engine.begin() as conn:
+                migration(conn)
+                stamp(conn, version + 1)
+        applied.append(migration.__name__)
+        version += 1
+
+    # Tables added after the database was first created
+    with engine.begin() as conn:
+        db.metadata.create_all(conn)
+    return applied
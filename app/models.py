@@ -1,18 +1,133 @@
 from datetime import datetime
+from sqlalchemy import DDL, event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.hybrid import Comparator, hybrid_property
+from sqlalchemy.orm import Session
 from app import db
+from app.changes import CHANGES_DDL, TRIM_CHANGES_DDL
+from app.search import DROP_SEARCH_DDL, SEARCH_DDL
+from app.stats import STATS_DDL
+
+# Priority names, least urgent first. Each is stored as its position here
+# counting from 1, so priorities sort and compare by urgency.
+PRIORITIES = ['Low', 'Medium', 'High']
+PRIORITY_RANKS = {name: rank for rank, name in enumerate(PRIORITIES, start=1)}
+
+class Priority(db.TypeDecorator):
+    """A priority name stored as its rank in PRIORITIES.
+
+    Names outside PRIORITIES bind as NULL, so filtering on one matches no rows.
+    """
+    impl = db.SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else PRIORITY_RANKS.get(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else PRIORITIES[value - 1]
+
+class Category(db.Model):
+    """Category names, stored once and referenced from tasks by id.
+
+    Rows are added when a task first uses a name (see intern_categories and
+    category_ids) and are never removed.
+    """
+    __tablename__ = 'categories'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f'<Category {self.name}>'
+
+def category_ids(session, names):
+    """Return {name: id} for names, adding the categories that don't exist yet."""
+    names = set(names)
+    if not names:
+        return {}
+    session.execute(sqlite_insert(Category).on_conflict_do_nothing(), [{'name': name} for name in names])
+    return dict(session.execute(select(Category.name, Category.id).where(Category.name.in_(names))).all())
+
+class CategoryComparator(Comparator):
+    """Class-level Task.category.
+
+    Equality looks the name up in categories once and compares category_id,
+    so category filters use the category_id indexes. Used as a column it is
+    the name, read through a correlated subquery.
+    """
+
+    def __init__(self, expression, category_id):
+        super().__init__(expression)
+        self.category_id = category_id
+
+    def lookup(self, name):
+        return select(Category.id).where(Category.name == name).scalar_subquery()
+
+    def __eq__(self, other):
+        return self.category_id == self.lookup(other)
+
+    def __ne__(self, other):
+        # An unknown name looks up NULL, which every task is distinct from
+        return self.category_id.is_distinct_from(self.lookup(other))
 
 class Task(db.Model):
     __tablename__ = 'tasks'
 
+    # GET /tasks filters on category/priority equality and a deadline range,
+    # and orders by one of its sortable fields with id as tie-breaker. Each
+    # index leads with the equality filters and ends with the sort column; the
+    # implicit trailing rowid (id) covers the tie-breaker, so every
+    # filter + sort combination is an index walk with no temp B-tree sort.
+    # Filtering on both category and priority uses the category_id, priority
+    # indexes alone: each index slows every insert, so none duplicates
+    # another's lookups.
+    __table_args__ = (
+        db.Index('ix_tasks_title', 'title'),
+        db.Index('ix_tasks_category', 'category_id'),
+        db.Index('ix_tasks_priority', 'priority'),
+        db.Index('ix_tasks_deadline', 'deadline'),
+        db.Index('ix_tasks_created_at', 'created_at'),
+        db.Index('ix_tasks_category_title', 'category_id', 'title'),
+        db.Index('ix_tasks_category_priority', 'category_id', 'priority'),
+        db.Index('ix_tasks_category_deadline', 'category_id', 'deadline'),
+        db.Index('ix_tasks_category_created_at', 'category_id', 'created_at'),
+        db.Index('ix_tasks_priority_title', 'priority', 'title'),
+        db.Index('ix_tasks_priority_deadline', 'priority', 'deadline'),
+        db.Index('ix_tasks_priority_created_at', 'priority', 'created_at'),
+        db.Index('ix_tasks_category_priority_title', 'category_id', 'priority', 'title'),
+        db.Index('ix_tasks_category_priority_deadline', 'category_id', 'priority', 'deadline'),
+        db.Index('ix_tasks_category_priority_created_at', 'category_id', 'priority', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    category = db.Column(db.String(50), nullable=False)
-    priority = db.Column(db.String(10), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
+    priority = db.Column(Priority, nullable=False)
     deadline = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Loaded with the task, so reading the name never needs another query
+    category_ref = db.relationship(Category, lazy='joined', innerjoin=True)
+
+    @hybrid_property
+    def category(self):
+        """The category name, as the API sends and receives it."""
+        return self.category_ref.name if self.category_ref is not None else None
+
+    @category.inplace.setter
+    def _category_setter(self, name):
+        # Swapped for the stored category of that name on flush
+        self.category_ref = Category(name=name)
+
+    @category.inplace.comparator
+    @classmethod
+    def _category_comparator(cls):
+        name = select(Category.name).where(Category.id == cls.category_id).correlate_except(Category).scalar_subquery()
+        return CategoryComparator(name, cls.category_id)
+
     def __repr__(self):
         return f'<Task {self.title}>'
     
@@ -28,4 +143,73 @@ class Task(db.Model):
             'deadline': iso(self.deadline),
             'created_at': iso(self.created_at),
             'updated_at': iso(self.updated_at)
-        }
\ No newline at end of file
+        }
+
+class TaskStat(db.Model):
+    """Number of tasks per category, priority and deadline day.
+
+    Maintained by triggers on tasks (see app.stats), never written directly.
+    """
+    __tablename__ = 'task_stats'
+
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), primary_key=True)
+    priority = db.Column(Priority, primary_key=True)
+    deadline_date = db.Column(db.Date, primary_key=True)
+    task_count = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<TaskStat {self.category_id} {self.priority} {self.deadline_date}: {self.task_count}>'
+
+class TaskChange(db.Model):
+    """Latest change to a task, in commit order, for GET /tasks/changes.
+
+    Written by triggers on tasks (see app.changes), never directly.
+    """
+    __tablename__ = 'task_changes'
+    __table_args__ = (
+        db.Index('ix_task_changes_task_id', 'task_id'),
+        # Keeps seq from reusing the numbers of removed rows
+        {'sqlite_autoincrement': True},
+    )
+
+    seq = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<TaskChange {self.seq} {self.op} {self.task_id}>'
+
+# The full-text index lives outside the metadata, so create and drop it along
+# with the tasks table
+for statement in SEARCH_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(statement))
+event.listen(Task.__table__, 'before_drop', DDL(DROP_SEARCH_DDL))
+
+# Triggers keeping task_stats in step with tasks
+for statement in STATS_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(statement))
+
+# Triggers recording every write in task_changes
+for statement in CHANGES_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(statement))
+event.listen(TaskChange.__table__, 'after_create', DDL(TRIM_CHANGES_DDL))
+
+@event.listens_for(Session, 'before_flush')
+def intern_categories(session, flush_context, instances):
+    """Point new and changed tasks at the stored category of their name.
+
+    Task.category's setter gives a task a new, unsaved Category; this swaps
+    it for the existing row, adding the row first when the name is new, so
+    each name is stored once.
+    """
+    pending = [obj for obj in session.new if isinstance(obj, Category)]
+    if not pending:
+        return
+    with session.no_autoflush:
+        ids = category_ids(session, [category.name for category in pending])
+        for task in list(session.new) + list(session.dirty):
+            if isinstance(task, Task) and task.category_ref in pending:
+                task.category_ref = session.get(Category, ids[task.category_ref.name])
+        for category in pending:
+            session.expunge(category)
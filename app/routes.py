@@ -1,10 +1,23 @@
-from flask import Blueprint, request, jsonify
-from app import db
-from app.models import Task
-from app.schemas import task_schema, tasks_schema
-from sqlalchemy import desc
+import csv
+import io
+import json
+import time
+from datetime import datetime
 
-from app.utils import parse_datetime
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from app import cache, change_feed, db, metrics
+from app.changes import RETENTION
+from app.database import serialized_write
+from app.importer import InvalidEncoding, import_tasks, insert_tasks, resolve_categories, validate_tasks
+from app.models import Category, Task, TaskChange, TaskStat
+from app.schemas import task_row_encoder, task_schema
+from app.search import match_filter, tasks_fts
+from app.stats import summarize
+from sqlalchemy import delete, desc, func, select, tuple_, update
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+
+from app.utils import decode_cursor, encode_cursor, parse_datetime
 
 bp = Blueprint('tasks', __name__)
 
@@ -12,19 +25,9 @@ bp = Blueprint('tasks', __name__)
 def index():
     return jsonify({'message': 'Welcome to the Task Management API'})
 
-# Insert tasks to database
-@bp.route('/tasks', methods=['POST'])
-def create_task():
-    data = request.get_json()
-    
-    if not data:
-        return jsonify({'message': 'No input data provided'}), 404
-    
-    errors = task_schema.validate(data)
-    if errors:
-        return jsonify({'message': '400 Bad Request', 'errors': errors}), 400
-
-    task = Task(
+def new_task(data):
+    """Build a Task from a validated create payload."""
+    return Task(
         title=data['title'],
         description=data.get('description'),
         category=data['category'],
@@ -32,73 +35,285 @@ def create_task():
         deadline=parse_datetime(data['deadline'])
     )
 
-    db.session.add(task)
-    db.session.commit()
+def apply_update(task, data):
+    """Copy the fields of a validated partial update payload onto task."""
+    allowed_fields = ['title', 'description', 'category', 'priority', 'deadline']
+    for field in allowed_fields:
+        if field in data:
+            if field == 'deadline':
+                setattr(task, field, parse_datetime(data[field]))
+            else:
+                setattr(task, field, data[field])
+
+# Checks and responses of the single-task routes, shared with app.asgi.
+# The *_error helpers return an error response, or None if the request is valid.
 
+def create_error(data):
+    if not data:
+        return jsonify({'message': 'No input data provided'}), 404
+
+    errors = task_schema.validate(data)
+    if errors:
+        return jsonify({'message': '400 Bad Request', 'errors': errors}), 400
+    return None
+
+def created_response(task):
     return jsonify({
         'message': 'Task created successfully',
         'task': task_schema.dump(task)
     }), 201
 
+def update_error(task, data):
+    if not task:
+        return task_not_found()
+
+    if not data:
+        return jsonify({'message': 'No input data provided'}), 400
+
+    errors = task_schema.validate(data, partial=True)
+    if errors:
+        current_app.logger.debug('Validation errors: %s', errors)
+        return jsonify({'message': 'Invalid input', 'errors': errors}), 400
+    return None
+
+def updated_response(task):
+    return jsonify({
+        'message': 'Task updated successfully',
+        'task': task_schema.dump(task)
+    })
+
+def task_response(task):
+    if not task:
+        return task_not_found()
+    with metrics.timed('serialize'):
+        data = task_schema.dump(task)
+    return jsonify(data)
+
+def deleted_response():
+    return jsonify({'message': 'Task deleted successfully'})
+
+def task_not_found():
+    return jsonify({'message': 'Task not found'}), 404
+
+# Insert tasks to database
+@bp.route('/tasks', methods=['POST'])
+@serialized_write
+def create_task():
+    data = request.get_json()
+    response = create_error(data)
+    if response is not None:
+        return response
+
+    task = new_task(data)
+    db.session.add(task)
+    db.session.commit()
+    cache.invalidate()
+    return created_response(task)
+
+# Fields accepted by sort_by on GET /tasks
+SORTABLE_FIELDS = ['title', 'category', 'priority', 'deadline', 'created_at']
+
+def parse_limit(value):
+    """Parse the limit query parameter, capped at TASKS_MAX_PAGE_SIZE."""
+    if value is None:
+        return current_app.config['TASKS_PAGE_SIZE']
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid limit: {value}. Must be a positive integer")
+    if limit < 1:
+        raise ValueError(f"Invalid limit: {value}. Must be a positive integer")
+    return min(limit, current_app.config['TASKS_MAX_PAGE_SIZE'])
+
+def keyset_filter(cursor, sort_by, order, pinned):
+    """Build the WHERE clause that resumes a listing after the given cursor.
+
+    Rows are ordered by (sort_by, id), so the next page starts strictly after
+    the last (value, id) pair seen. When sort_by is pinned to a single value by
+    an equality filter only the id needs comparing.
+    """
+    data = decode_cursor(cursor)
+    if data.get('sort_by') != sort_by or data.get('order') != order:
+        raise ValueError('Cursor does not match the requested sort_by and order')
+
+    last_id = data.get('id')
+    value = data.get('value')
+    if not isinstance(last_id, int) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    sort_column = sort_key(sort_by)
+    if isinstance(sort_column.type, db.DateTime):
+        value = parse_datetime(value)
+
+    if pinned:
+        return Task.id < last_id if order == 'desc' else Task.id > last_id
+
+    key = tuple_(sort_column, Task.id)
+    return key < (value, last_id) if order == 'desc' else key > (value, last_id)
+
+def no_index(column):
+    """Wrap a column in SQLite's unary + so the planner won't use its indexes."""
+    return UnaryExpression(column, operator=operators.custom_op('+'), type_=column.type)
+
+def make_cursor(row, sort_by, order):
+    value = getattr(row, sort_by)
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return encode_cursor({'sort_by': sort_by, 'order': order, 'value': value, 'id': row.id})
+
+def task_columns():
+    """Task columns in the order task_row_encoder expects them."""
+    return [getattr(Task, field).label(field) for field in task_row_encoder.fields]
+
+def sort_key(sort_by):
+    """Column that sort_by orders on; categories sort by name, through a join."""
+    return Category.name if sort_by == 'category' else getattr(Task, sort_by)
+
+def build_tasks_query(args):
+    """Build the filtered and sorted Task select shared by the list endpoints.
+
+    Returns (query, sort_by, order). Raises ValueError with a client-facing
+    message when a parameter is invalid. The statement is executed by the
+    caller, so the async app (app.asgi) shares it.
+    """
+    category = args.get('category')
+    priority = args.get('priority')
+    deadline_from = args.get('deadline_from')
+    deadline_to = args.get('deadline_to')
+    q = args.get('q')
+    sort_by = args.get('sort_by', 'relevance' if q else 'created_at')
+    order = args.get('order', 'desc').lower()
+
+    # Validate sort_by field exists
+    if sort_by == 'relevance':
+        if not q:
+            raise ValueError('Sorting by relevance requires a search query (q)')
+    elif sort_by not in SORTABLE_FIELDS:
+        raise ValueError(
+            f'Invalid sort field: {sort_by}. '
+            'Available fields: title, category, priority, deadline, created_at'
+        )
+
+    if order not in ['asc', 'desc']:
+        raise ValueError('Invalid order value. Use "asc" or "desc"')
+
+    query = select(Task)
+
+    # Unless sorting by deadline, keep the planner off the deadline
+    # indexes so it walks the sort index instead of sorting a range scan
+    deadline_column = Task.deadline if sort_by == 'deadline' else no_index(Task.deadline)
+    # Likewise for priority when sorting by category name, which walks
+    # categories first and then each category's tasks in id order
+    priority_column = no_index(Task.priority) if sort_by == 'category' else Task.priority
+
+    # Full-text search
+    if q:
+        query = query.join(tasks_fts, tasks_fts.c.rowid == Task.id).where(match_filter(q))
+
+    # Filtering
+    if category:
+        query = query.where(Task.category == category)
+    if priority:
+        query = query.where(priority_column == priority)
+    if deadline_from:
+        query = query.where(deadline_column >= parse_datetime(deadline_from))
+    if deadline_to:
+        query = query.where(deadline_column <= parse_datetime(deadline_to))
+
+    # Sorting, with id as tie-breaker so every row has a stable position
+    if sort_by == 'relevance':
+        return query.order_by(tasks_fts.c.rank, Task.id), sort_by, order
+
+    if sort_by == 'category':
+        # Walks categories in name order and each one's tasks through the
+        # category_id indexes, so the order needs no sort step
+        query = query.join(Category, Category.id == Task.category_id)
+    sort_column = sort_key(sort_by)
+    if order == 'desc':
+        query = query.order_by(desc(sort_column), desc(Task.id))
+    else:
+        query = query.order_by(sort_column, Task.id)
+
+    return query, sort_by, order
+
+def ranked_matches(query):
+    """Reorder a search query by relevance, ranking only its newest matches.
+
+    bm25 is computed for every row that gets ranked, which takes hundreds of
+    milliseconds for a common word in a large table. FTS5 walks matches in id
+    order, so only the TASKS_SEARCH_MAX_RANKED most recently created matching
+    tasks are read and ranked, however many match.
+    """
+    candidates = (query.with_only_columns(tasks_fts.c.rowid.label('id'), tasks_fts.c.rank.label('rank'))
+                  .order_by(None).order_by(desc(tasks_fts.c.rowid))
+                  .limit(current_app.config['TASKS_SEARCH_MAX_RANKED'])
+                  .subquery())
+    return (select(Task).join(candidates, candidates.c.id == Task.id)
+            .order_by(candidates.c.rank, Task.id))
+
+def tasks_page_query(args):
+    """Build the statement for one GET /tasks page.
+
+    Returns (statement, limit, sort_by, order); the statement selects one row
+    more than limit, which tells whether another page exists. Raises
+    ValueError for invalid parameters.
+    """
+    cursor = args.get('cursor')
+    query, sort_by, order = build_tasks_query(args)
+    limit = parse_limit(args.get('limit'))
+
+    if sort_by == 'relevance':
+        # bm25 scores shift with every write, so they can't anchor a cursor
+        if cursor:
+            raise ValueError('Results sorted by relevance are not paginated; '
+                             'sort by another field to page through every match')
+        query = ranked_matches(query)
+    # Keyset pagination: resume after the last row of the previous page
+    elif cursor:
+        pinned = ((sort_by == 'category' and args.get('category'))
+                  or (sort_by == 'priority' and args.get('priority')))
+        query = query.where(keyset_filter(cursor, sort_by, order, bool(pinned)))
+
+    # Select plain row tuples in TaskSchema field order rather than Task
+    # instances; task_row_encoder serializes them like tasks_schema would.
+    columns = task_columns()
+    return query.with_only_columns(*columns).limit(limit + 1), limit, sort_by, order
+
+def tasks_page(tasks, limit, sort_by, order):
+    """Build the GET /tasks response body from the rows of tasks_page_query."""
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        if sort_by != 'relevance':
+            next_cursor = make_cursor(tasks[-1], sort_by, order)
+
+    if not tasks:
+        return {
+            'message': 'No tasks found matching the criteria',
+            'data': [],
+            'next_cursor': None
+        }  # Return 200 with empty list instead of 404
+
+    with metrics.timed('serialize'):
+        data = task_row_encoder.dump_many(tasks)
+    return {
+        'message': 'Tasks retrieved successfully',
+        'data': data,
+        'next_cursor': next_cursor
+    }
+
 # Get with filter
 @bp.route('/tasks', methods=['GET'])
+@cache.cached
 def get_tasks():
     try:
-        # Get query parameters
-        category = request.args.get('category')
-        priority = request.args.get('priority')
-        deadline_from = request.args.get('deadline_from')
-        deadline_to = request.args.get('deadline_to')
-        sort_by = request.args.get('sort_by', 'created_at')
-        order = request.args.get('order', 'desc')
-
-        # Validate sort_by field exists
-        if not hasattr(Task, sort_by):
-            return jsonify({
-                'message': f'Invalid sort field: {sort_by}. '
-                'Available fields: title, category, priority, deadline, created_at'
-            }), 400
-
-        query = Task.query
-
-        # Filtering
-        if category:
-            query = query.filter(Task.category == category)
-        if priority:
-            query = query.filter(Task.priority == priority)
-        if deadline_from:
-            try:
-                from_dt = parse_datetime(deadline_from)
-                query = query.filter(Task.deadline >= from_dt)
-            except ValueError as e:
-                return jsonify({'message': str(e)}), 400
-        if deadline_to:
-            try:
-                to_dt = parse_datetime(deadline_to)
-                query = query.filter(Task.deadline <= to_dt)
-            except ValueError as e:
-                return jsonify({'message': str(e)}), 400
-
-        # Sorting
-        sort_column = getattr(Task, sort_by)
-        if order.lower() not in ['asc', 'desc']:
-            return jsonify({
-                'message': 'Invalid order value. Use "asc" or "desc"'
-            }), 400
-            
-        query = query.order_by(desc(sort_column) if order.lower() == 'desc' else sort_column)
-
-        tasks = query.all()
-        if not tasks:
-            return jsonify({
-                'message': 'No tasks found matching the criteria',
-                'data': []
-            }), 200  # Return 200 with empty list instead of 404
-            
-        return jsonify({
-            'message': 'Tasks retrieved successfully',
-            'data': tasks_schema.dump(tasks)
-        })
+        try:
+            statement, limit, sort_by, order = tasks_page_query(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        tasks = db.session.execute(statement).all()
+        return jsonify(tasks_page(tasks, limit, sort_by, order))
 
     except Exception as e:
         return jsonify({
@@ -106,50 +321,450 @@ def get_tasks():
             'error': str(e)
         }), 500
     
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def export_chunks(rows, fmt, chunk_size):
+    """Serialize row tuples into ndjson or csv text, one chunk per chunk_size rows.
+
+    Rows are written straight from the column tuples with task_row_encoder,
+    so no ORM or marshmallow objects are built.
+    """
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(task_row_encoder.fields)
+        # Send the header right away, before the first batch is fetched
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    count = 0
+    for row in rows:
+        if fmt == 'csv':
+            writer.writerow(task_row_encoder.values(row))
+        else:
+            buffer.write(json.dumps(task_row_encoder.dump(row)))
+            buffer.write('\n')
+        count += 1
+        if count == chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+
+    if count:
+        yield buffer.getvalue()
+
+# Stream all matching tasks
+@bp.route('/tasks/export', methods=['GET'])
+def export_tasks():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'message': 'Invalid format value. Use "ndjson" or "csv"'}), 400
+
+    try:
+        query, _, _ = build_tasks_query(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    # yield_per streams results from the cursor in batches instead of
+    # loading the whole result set before the first row is written
+    chunk_size = current_app.config['TASKS_EXPORT_CHUNK_SIZE']
+    rows = db.session.execute(query.with_only_columns(*task_columns()).execution_options(yield_per=chunk_size))
+
+    response = Response(stream_with_context(export_chunks(rows, fmt, chunk_size)),
+                        mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=tasks.{fmt}'
+    return response
+
+# Aggregate counts, read from the task_stats summary table
+MAX_UPCOMING_DAYS = 3650
+
+def stats_query(args):
+    """Build the task_stats select for GET /tasks/stats.
+
+    Returns (query, upcoming_days). Raises ValueError for invalid parameters.
+    """
+    category = args.get('category')
+    priority = args.get('priority')
+    deadline_from = args.get('deadline_from')
+    deadline_to = args.get('deadline_to')
+    upcoming_days = args.get('upcoming_days', '7')
+
+    # isdigit alone accepts digits int() rejects, such as superscripts
+    if (not (upcoming_days.isascii() and upcoming_days.isdigit())
+            or int(upcoming_days) > MAX_UPCOMING_DAYS):
+        raise ValueError(f'Invalid upcoming_days: {upcoming_days}. '
+                         f'Must be an integer from 0 to {MAX_UPCOMING_DAYS}')
+
+    query = (select(Category.name, TaskStat.priority, TaskStat.deadline_date, TaskStat.task_count)
+             .join(Category, Category.id == TaskStat.category_id))
+    if category:
+        query = query.where(Category.name == category)
+    if priority:
+        query = query.where(TaskStat.priority == priority)
+    # Deadlines are counted per day, so the range is applied by day
+    if deadline_from:
+        query = query.where(TaskStat.deadline_date >= parse_datetime(deadline_from).date())
+    if deadline_to:
+        query = query.where(TaskStat.deadline_date <= parse_datetime(deadline_to).date())
+    return query, int(upcoming_days)
+
+@bp.route('/tasks/stats', methods=['GET'])
+def get_task_stats():
+    try:
+        query, upcoming_days = stats_query(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    summary = summarize(db.session.execute(query), datetime.utcnow().date(), upcoming_days)
+    return jsonify(dict(summary, message='Task statistics retrieved successfully'))
+
+def changes_query(since, limit):
+    """Select up to limit changes after seq since, each with the task as it is now."""
+    return (select(*task_columns(), TaskChange.seq, TaskChange.op, TaskChange.task_id)
+            .outerjoin(Task, Task.id == TaskChange.task_id)
+            .where(TaskChange.seq > since)
+            .order_by(TaskChange.seq)
+            .limit(limit))
+
+def change_record(row):
+    return {
+        'seq': row.seq,
+        'op': row.op,
+        'id': row.task_id,
+        # The encoder ignores the trailing change columns
+        'task': None if row.op == 'delete' else task_row_encoder.dump(row),
+    }
+
+def change_event(change):
+    return f"id: {change['seq']}\nevent: {change['op']}\ndata: {current_app.json.dumps(change)}\n\n"
+
+def parse_changes_request():
+    """Return (since, wait, limit) for GET /tasks/changes; since is None when not given.
+
+    Raises ValueError for invalid parameters.
+    """
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    wait = request.args.get('wait', '0')
+    if since is not None and not since.isdigit():
+        raise ValueError(f'Invalid since: {since}. Must be a non-negative integer')
+    if not wait.isdigit():
+        raise ValueError(f'Invalid wait: {wait}. Must be a non-negative integer')
+    limit = parse_limit(request.args.get('limit'))
+    since = None if since is None else int(since)
+    return since, min(int(wait), current_app.config['TASKS_CHANGES_MAX_WAIT']), limit
+
+def changes_position(since, last_seq):
+    """Return the response for a request that can't be answered from since, or None.
+
+    Without since that is the current position; a since older than the
+    retained changes gets 410.
+    """
+    if since is None:
+        # Where a new client starts: load the task list, then follow from here
+        return jsonify({'message': 'Current position', 'changes': [], 'last_seq': last_seq, 'has_more': False})
+    if since < last_seq - RETENTION:
+        return jsonify({
+            'message': 'Changes this old are no longer kept. Reload the task list and resume from last_seq',
+            'last_seq': last_seq
+        }), 410
+    return None
+
+def changes_page(changes, since, limit):
+    """Build the GET /tasks/changes body from up to limit + 1 changes."""
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return {
+        'message': 'Changes retrieved successfully',
+        'changes': changes,
+        'last_seq': changes[-1]['seq'] if changes else since,
+        'has_more': has_more
+    }
+
+def fetch_changes(since, limit):
+    return [change_record(row) for row in db.session.execute(changes_query(since, limit))]
+
+def wait_for_changes(since, limit, seconds):
+    """Fetch changes after since, waiting up to seconds for one to be committed."""
+    deadline = time.monotonic() + seconds
+    recheck = current_app.config['TASKS_CHANGES_RECHECK_INTERVAL']
+    while True:
+        # Read before querying, so a commit in between still ends the wait
+        generation = change_feed.generation()
+        changes = fetch_changes(since, limit)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            return changes
+        # Don't keep a pooled connection checked out while idle
+        db.session.close()
+        change_feed.wait(generation, min(remaining, recheck))
+
+def change_events(since, limit, seconds):
+    """Server-sent events for each change after since, for up to seconds."""
+    deadline = time.monotonic() + seconds
+    recheck = current_app.config['TASKS_CHANGES_RECHECK_INTERVAL']
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        changes = wait_for_changes(since, limit, min(remaining, recheck))
+        if not changes:
+            # Nothing new for a while; keeps proxies from closing the stream
+            yield ': keep-alive\n\n'
+            continue
+        for change in changes:
+            yield change_event(change)
+        since = changes[-1]['seq']
+
+# Changes since a sequence number, optionally waiting for the next one
+@bp.route('/tasks/changes', methods=['GET'])
+def get_task_changes():
+    try:
+        since, wait, limit = parse_changes_request()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    last_seq = db.session.scalar(select(func.max(TaskChange.seq))) or 0
+    response = changes_position(since, last_seq)
+    if response is not None:
+        return response
+
+    if request.accept_mimetypes.best == 'text/event-stream':
+        seconds = current_app.config['TASKS_CHANGES_STREAM_SECONDS']
+        return Response(stream_with_context(change_events(since, limit, seconds)),
+                        mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    return jsonify(changes_page(wait_for_changes(since, limit + 1, wait), since, limit))
+
+# Response cache counters
+@bp.route('/tasks/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(cache.stats())
+
 # Get by ID
 @bp.route('/tasks/<int:id>', methods=['GET'])
+@cache.cached
 def get_task(id):
-    task = db.session.get(Task, id)
-    if not task:
-        return jsonify({'message': 'Task not found'}), 404
-    return jsonify(task_schema.dump(task))
+    return task_response(db.session.get(Task, id))
 
 @bp.route('/tasks/<int:id>', methods=['PUT'])
+@serialized_write
 def update_task(id):
     task = db.session.get(Task, id)
     data = request.get_json()
+    response = update_error(task, data)
+    if response is not None:
+        return response
 
-    if not task:
-        return jsonify({'message': 'Task not found'}), 404
-
-    if not data:
-        return jsonify({'message': 'No input data provided'}), 400
-
-    errors = task_schema.validate(data, partial=True)
-    if errors:
-        print("Validation errors:", errors)  # Debug print
-        return jsonify({'message': 'Invalid input', 'errors': errors}), 400
-
-    allowed_fields = ['title', 'description', 'category', 'priority', 'deadline']
-    for field in allowed_fields:
-        if field in data:
-            if field == 'deadline':
-                setattr(task, field, parse_datetime(data[field]))
-            else:
-                setattr(task, field, data[field])
-
+    apply_update(task, data)
     db.session.commit()
-
-    return jsonify({
-        'message': 'Task updated successfully',
-        'task': task_schema.dump(task)
-    })
+    cache.invalidate()
+    return updated_response(task)
 
 @bp.route('/tasks/<int:id>', methods=['DELETE'])
+@serialized_write
 def delete_task(id):
     task = db.session.get(Task, id)
     if not task:
-        return jsonify({'message': 'Task not found'}), 404
+        return task_not_found()
     db.session.delete(task)
     db.session.commit()
-    return jsonify({'message': 'Task deleted successfully'})
\ No newline at end of file
+    cache.invalidate()
+    return deleted_response()
+
+# Bulk endpoints
+#
+# Each endpoint takes a JSON array, validates it in one schema pass and writes
+# every valid item with a single executemany in one transaction. With
+# mode=atomic (the default) any invalid item rejects the whole batch; with
+# mode=partial the valid items are written and the invalid ones reported.
+
+def parse_bulk_request():
+    """Return (items, atomic) for a bulk request, or raise ValueError."""
+    mode = request.args.get('mode', 'atomic')
+    if mode not in ['atomic', 'partial']:
+        raise ValueError('Invalid mode value. Use "atomic" or "partial"')
+
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        raise ValueError('Expected a non-empty JSON array')
+
+    max_items = current_app.config['TASKS_BULK_MAX_ITEMS']
+    if len(items) > max_items:
+        raise ValueError(f'Too many items: {len(items)}. Maximum is {max_items}')
+    return items, mode == 'atomic'
+
+def bulk_response(results, atomic, success_status):
+    """Build the response for a bulk request from its per-item results."""
+    failed = sum(1 for result in results if 'errors' in result)
+    succeeded = len(results) - failed
+    if failed and atomic:
+        # Nothing was written, so no item can be reported as succeeded
+        results = [result for result in results if 'errors' in result]
+        return jsonify({
+            'message': 'Invalid input, no tasks were written',
+            'succeeded': 0,
+            'failed': failed,
+            'results': results
+        }), 400
+
+    return jsonify({
+        'message': 'Bulk request processed' if failed else 'Bulk request processed successfully',
+        'succeeded': succeeded,
+        'failed': failed,
+        'results': results
+    }), 207 if failed else success_status
+
+def ids_by_index(items):
+    """Split items into ({index: id}, {index: errors}) for update/delete requests."""
+    ids, errors, seen = {}, {}, set()
+    for index, item in enumerate(items):
+        task_id = item.get('id') if isinstance(item, dict) else item
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            errors[index] = {'id': ['Missing or invalid id.']}
+        elif task_id in seen:
+            errors[index] = {'id': ['Duplicate id in request.']}
+        else:
+            seen.add(task_id)
+            ids[index] = task_id
+
+    existing = set()
+    id_list = list(ids.values())
+    # Stay well below SQLite's bound parameter limit
+    for start in range(0, len(id_list), 500):
+        chunk = id_list[start:start + 500]
+        existing.update(db.session.scalars(select(Task.id).where(Task.id.in_(chunk))))
+    for index, task_id in list(ids.items()):
+        if task_id not in existing:
+            errors[index] = {'id': ['Task not found.']}
+            del ids[index]
+    return ids, errors
+
+@bp.route('/tasks/bulk', methods=['POST'])
+@serialized_write
+def bulk_create_tasks():
+    try:
+        items, atomic = parse_bulk_request()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    rows, errors = validate_tasks(items)
+    created = {}
+    if rows and not (errors and atomic):
+        ids = insert_tasks(resolve_categories(list(rows.values())))
+        db.session.commit()
+        cache.invalidate()
+        created = dict(zip(rows, ids))
+
+    results = []
+    for index in range(len(items)):
+        if index in errors:
+            results.append({'index': index, 'errors': errors[index]})
+        elif index in created:
+            results.append({'index': index, 'id': created[index]})
+    return bulk_response(results, atomic, 201)
+
+@bp.route('/tasks/bulk', methods=['PATCH'])
+@serialized_write
+def bulk_update_tasks():
+    try:
+        items, atomic = parse_bulk_request()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    ids, errors = ids_by_index(items)
+    # id is dump_only on the schema, so validate the fields without it
+    changes = [{k: v for k, v in item.items() if k != 'id'} if isinstance(item, dict) else item
+               for item in items]
+    changed, change_errors = validate_tasks(changes, partial=True)
+    for index, item_errors in change_errors.items():
+        errors.setdefault(index, {}).update(item_errors)
+
+    rows = {}
+    for index, task_id in ids.items():
+        if index in errors:
+            continue
+        if not changed[index]:
+            errors[index] = {'_schema': ['No fields to update.']}
+            continue
+        rows[index] = dict(changed[index], id=task_id)
+
+    if rows and not (errors and atomic):
+        db.session.execute(update(Task), resolve_categories(list(rows.values())))
+        db.session.commit()
+        cache.invalidate()
+
+    results = []
+    for index in range(len(items)):
+        if index in errors:
+            results.append({'index': index, 'errors': errors[index]})
+        else:
+            results.append({'index': index, 'id': rows[index]['id']})
+    return bulk_response(results, atomic, 200)
+
+@bp.route('/tasks/bulk', methods=['DELETE'])
+@serialized_write
+def bulk_delete_tasks():
+    try:
+        items, atomic = parse_bulk_request()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    ids, errors = ids_by_index(items)
+    if ids and not (errors and atomic):
+        id_list = list(ids.values())
+        for start in range(0, len(id_list), 500):
+            db.session.execute(delete(Task).where(Task.id.in_(id_list[start:start + 500])))
+        db.session.commit()
+        cache.invalidate()
+
+    results = []
+    for index in range(len(items)):
+        if index in errors:
+            results.append({'index': index, 'errors': errors[index]})
+        else:
+            results.append({'index': index, 'id': ids[index]})
+    return bulk_response(results, atomic, 200)
+
+# Stream a NDJSON or CSV upload into the database
+@bp.route('/tasks/import', methods=['POST'])
+def import_tasks_upload():
+    fmt = request.args.get('format')
+    if fmt is None:
+        fmt = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    if fmt not in ['ndjson', 'csv']:
+        return jsonify({'message': 'Invalid format value. Use "ndjson" or "csv"'}), 400
+
+    # Only the first rejected rows are returned, to keep the response bounded
+    max_errors = current_app.config['TASKS_IMPORT_MAX_REPORTED_ERRORS']
+    errors = []
+
+    def on_reject(record):
+        if len(errors) < max_errors:
+            errors.append(record)
+
+    try:
+        totals = import_tasks(request.stream, fmt, current_app.config['TASKS_IMPORT_BATCH_SIZE'],
+                              on_reject=on_reject)
+    except InvalidEncoding as e:
+        # Earlier batches are committed, so report them with the error
+        db.session.rollback()
+        return jsonify({
+            'message': f'Upload is not valid UTF-8 at line {e.line}',
+            'line': e.line,
+            'imported': e.totals['imported'],
+            'rejected': e.totals['rejected'],
+            'errors': errors
+        }), 400
+
+    return jsonify({
+        'message': 'Import finished',
+        'imported': totals['imported'],
+        'rejected': totals['rejected'],
+        'rows_per_second': round(totals['rows_per_second']),
+        'errors': errors
+    })
@@ -1,14 +1,54 @@
 from marshmallow import Schema, fields, validate
+from app.models import PRIORITIES
 
 class TaskSchema(Schema):
     id = fields.Int(dump_only=True)
     title = fields.Str(required=True, validate=validate.Length(min=1))
     description = fields.Str(allow_none=True)
     category = fields.Str(required=True)
-    priority = fields.Str(required=True, validate=validate.OneOf(['Low', 'Medium', 'High']))
+    priority = fields.Str(required=True, validate=validate.OneOf(PRIORITIES))
     deadline = fields.DateTime(required=True)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
+class RowEncoder:
+    """Serialize database row tuples the same way a schema's dump would.
+
+    Rows must hold the schema's dump fields, in order, as selected columns.
+    Only datetime fields need converting, so each gets an encoder compiled
+    from its format up front and every other value is passed through as is.
+    This skips marshmallow's per-field machinery for large list responses.
+    """
+
+    def __init__(self, schema):
+        self.fields = list(schema.dump_fields)
+        self.encoders = []
+        for index, field in enumerate(schema.dump_fields.values()):
+            if isinstance(field, fields.DateTime):
+                self.encoders.append((index, self.datetime_encoder(field)))
+
+    @staticmethod
+    def datetime_encoder(field):
+        data_format = field.format or field.DEFAULT_FORMAT
+        format_func = field.SERIALIZATION_FUNCS.get(data_format)
+        if format_func:
+            return format_func
+        return lambda value: value.strftime(data_format)
+
+    def values(self, row):
+        """Return the row's values as a list with datetimes encoded."""
+        values = list(row)
+        for index, encode in self.encoders:
+            if values[index] is not None:
+                values[index] = encode(values[index])
+        return values
+
+    def dump(self, row):
+        return dict(zip(self.fields, self.values(row)))
+
+    def dump_many(self, rows):
+        return [self.dump(row) for row in rows]
+
 task_schema = TaskSchema()
-tasks_schema = TaskSchema(many=True)
\ No newline at end of file
+tasks_schema = TaskSchema(many=True)
+task_row_encoder = RowEncoder(task_schema)
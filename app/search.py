@@ -0,0 +1,54 @@
+"""Full-text search over task titles and descriptions with SQLite FTS5.
+
+tasks_fts is an external-content FTS5 table: it indexes tasks.title and
+tasks.description without storing a second copy, and triggers on tasks keep it
+in sync with every insert, update and delete, including bulk writes and
+imports. Results are ranked with bm25 through the table's rank column.
+"""
+import re
+
+from sqlalchemy import column, table, text
+
+SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts "
+    "USING fts5(title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+
+DROP_SEARCH_DDL = 'DROP TABLE IF EXISTS tasks_fts'
+
+# Not part of the models' metadata, so create_all leaves it to SEARCH_DDL
+tasks_fts = table('tasks_fts', column('rowid'), column('rank'))
+
+
+def rebuild_search_index(conn):
+    """Reindex every task, e.g. after writes that bypassed the triggers."""
+    conn.exec_driver_sql("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def match_query(q):
+    """Turn free text into an FTS5 query matching rows containing every word.
+
+    Each word is quoted as a string, so FTS5 operators and punctuation in user
+    input can't produce a syntax error. Raises ValueError if nothing
+    searchable is left.
+    """
+    words = [word for word in q.split() if re.search(r'\w', word)]
+    if not words:
+        raise ValueError(f'Invalid search query: {q}')
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def match_filter(q):
+    return text('tasks_fts MATCH :q').bindparams(q=match_query(q))
@@ -0,0 +1,99 @@
+"""Task counts kept in a summary table for GET /tasks/stats.
+
+task_stats holds one row per (category_id, priority, deadline day) with the
+number of tasks in it. Triggers on tasks update it in the same transaction as
+every insert, update and delete, including bulk writes and imports, so reading
+the aggregates costs O(number of groups) instead of a scan of tasks. Deadlines
+are counted per day rather than as overdue/upcoming so the counts never go
+stale as time passes; the buckets are derived from the days when reading.
+"""
+from datetime import datetime, timedelta
+
+STATS_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS task_stats_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_stats (category_id, priority, deadline_date, task_count) "
+    "VALUES (new.category_id, new.priority, date(new.deadline), 1) "
+    "ON CONFLICT (category_id, priority, deadline_date) DO UPDATE SET task_count = task_count + 1; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_delete AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_stats SET task_count = task_count - 1 "
+    "WHERE category_id = old.category_id AND priority = old.priority AND deadline_date = date(old.deadline); "
+    "DELETE FROM task_stats WHERE task_count <= 0 "
+    "AND category_id = old.category_id AND priority = old.priority AND deadline_date = date(old.deadline); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_stats_update AFTER UPDATE OF category_id, priority, deadline ON tasks "
+    "WHEN old.category_id IS NOT new.category_id OR old.priority IS NOT new.priority "
+    "OR date(old.deadline) IS NOT date(new.deadline) BEGIN "
+    "UPDATE task_stats SET task_count = task_count - 1 "
+    "WHERE category_id = old.category_id AND priority = old.priority AND deadline_date = date(old.deadline); "
+    "DELETE FROM task_stats WHERE task_count <= 0 "
+    "AND category_id = old.category_id AND priority = old.priority AND deadline_date = date(old.deadline); "
+    "INSERT INTO task_stats (category_id, priority, deadline_date, task_count) "
+    "VALUES (new.category_id, new.priority, date(new.deadline), 1) "
+    "ON CONFLICT (category_id, priority, deadline_date) DO UPDATE SET task_count = task_count + 1; "
+    "END",
+]
+
+# The same groups computed from scratch
+GROUP_BY_TASKS = (
+    "SELECT category_id, priority, date(deadline) AS deadline_date, count(*) AS task_count "
+    "FROM tasks GROUP BY category_id, priority, date(deadline)"
+)
+
+
+def rebuild_stats(conn):
+    """Recompute task_stats from the tasks table."""
+    conn.exec_driver_sql('DELETE FROM task_stats')
+    conn.exec_driver_sql(
+        f'INSERT INTO task_stats (category_id, priority, deadline_date, task_count) {GROUP_BY_TASKS}'
+    )
+
+
+def stats_differences(conn):
+    """Return the groups where task_stats disagrees with a full GROUP BY.
+
+    Each difference is (category, priority, deadline_date, stored, actual),
+    with the category and priority as names.
+    """
+    from app.models import PRIORITIES
+
+    stored = {row[:3]: row[3] for row in conn.exec_driver_sql(
+        'SELECT category_id, priority, deadline_date, task_count FROM task_stats')}
+    actual = {row[:3]: row[3] for row in conn.exec_driver_sql(GROUP_BY_TASKS)}
+    names = dict(conn.exec_driver_sql('SELECT id, name FROM categories').all())
+    return [
+        (names.get(key[0], key[0]), PRIORITIES[key[1] - 1], key[2], stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(stored.keys() | actual.keys(), key=str)
+        if stored.get(key, 0) != actual.get(key, 0)
+    ]
+
+
+def summarize(groups, today, upcoming_days):
+    """Aggregate (category, priority, deadline_date, count) groups for the stats endpoint.
+
+    Deadlines before today are overdue, today's are due_today, the next
+    upcoming_days days are upcoming and anything after that is later.
+    """
+    today = today.isoformat()
+    upcoming_end = (datetime.fromisoformat(today) + timedelta(days=upcoming_days)).date().isoformat()
+    summary = {
+        'total': 0,
+        'by_category': {},
+        'by_priority': {},
+        'by_deadline': {'overdue': 0, 'due_today': 0, 'upcoming': 0, 'later': 0},
+    }
+    for category, priority, deadline_date, count in groups:
+        deadline_date = str(deadline_date)
+        summary['total'] += count
+        summary['by_category'][category] = summary['by_category'].get(category, 0) + count
+        summary['by_priority'][priority] = summary['by_priority'].get(priority, 0) + count
+        if deadline_date < today:
+            bucket = 'overdue'
+        elif deadline_date == today:
+            bucket = 'due_today'
+        elif deadline_date <= upcoming_end:
+            bucket = 'upcoming'
+        else:
+            bucket = 'later'
+        summary['by_deadline'][bucket] += count
+    return summary
@@ -1,7 +1,20 @@
+import base64
+import json
+import re
 from datetime import datetime
 
+# Zero-padded dates and datetimes, the forms clients send nearly always.
+# datetime.fromisoformat parses them exactly like the matching formats in
+# parse_datetime, in a fraction of the time strptime takes.
+ISO_DATETIME = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[ T][0-9]{2}:[0-9]{2}:[0-9]{2})?')
+
 def parse_datetime(date_str):
     """Parse a datetime string into a datetime object."""
+    if ISO_DATETIME.fullmatch(date_str):
+        try:
+            return datetime.fromisoformat(date_str)
+        except ValueError:
+            pass  # An impossible date, such as month 13; reported below
     formats = [
         '%Y-%m-%d %H:%M:%S',  # 2023-01-01 15:00:00
         '%Y-%m-%d',           # 2023-01-01
@@ -20,4 +33,22 @@ def parse_datetime(date_str):
         f"Invalid date format: {date_str}. "
         "Supported formats are: YYYY-MM-DD, YYYY-MM-DD HH:MM:SS, "
         "YYYY-MM-DDThh:mm:ss, YYYY-MM-DDThh:mm:ss.sss"
-    )
\ No newline at end of file
+    )
+
+def encode_cursor(data):
+    """Encode a pagination cursor into an opaque URL-safe string."""
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor back into a dict."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return data
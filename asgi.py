@@ -0,0 +1,11 @@
+"""ASGI entry point using the production SQLite profile.
+
+    uvicorn --workers 1 asgi:app
+
+Needs aiosqlite and uvicorn. Writes are serialized inside the process, so
+run a single worker, as with wsgi.py.
+"""
+from app.asgi import create_asgi_app
+from config import ProductionConfig
+
+app = create_asgi_app(ProductionConfig)
@@ -0,0 +1,190 @@
+"""Compare the WSGI and ASGI serving modes under concurrency.
+
+Runs the app with ProductionConfig on a file-backed database, once as the
+WSGI app on a server with a fixed pool of threads (like gunicorn --threads)
+and once as the ASGI app under uvicorn. Each run holds --pollers clients in
+long polls on /tasks/changes, which are re-issued as soon as they return,
+while --workers clients send a mix of list reads, single reads and updates.
+Reports the throughput and latency percentiles of that mix; in WSGI mode
+every waiting long poll holds one of the server's threads, which shows up
+in the tail. The response cache is turned off so reads hit the database.
+
+Needs uvicorn and aiosqlite.
+
+Usage:
+    python benchmarks/bench_asgi.py [--workers 16] [--pollers 32] [--threads 16] [--seconds 10]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+
+import uvicorn
+from werkzeug.serving import BaseWSGIServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.asgi import AsyncTaskApp  # noqa: E402
+from app.cache import NullCache  # noqa: E402
+from config import ProductionConfig  # noqa: E402
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """werkzeug server handling connections on a fixed pool of threads."""
+
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def make_app(path, seed_tasks):
+    class BenchConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        TASKS_CACHE_BACKEND = lambda app: NullCache()  # noqa: E731
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        response = app.test_client().post('/tasks/bulk', json=[task(n) for n in range(seed_tasks)])
+        assert response.status_code == 201, response.get_json()
+    return app
+
+
+def task(n):
+    return {'title': f'Task {n}', 'category': random.choice(['Work', 'Home', 'Errands']),
+            'priority': random.choice(['Low', 'Medium', 'High']), 'deadline': '2025-06-01 12:00:00'}
+
+
+def serve_wsgi(app, threads):
+    server = PooledWSGIServer('127.0.0.1', 0, app, threads)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.port, server.shutdown
+
+
+def serve_asgi(app):
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(AsyncTaskApp(app), log_level='warning', lifespan='on'))
+    thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def shutdown():
+        server.should_exit = True
+        thread.join()
+    return sock.getsockname()[1], shutdown
+
+
+def poller(port, deadline, wait, polls):
+    conn = HTTPConnection('127.0.0.1', port, timeout=wait + 60)
+    since = 0
+    while time.perf_counter() < deadline:
+        try:
+            conn.request('GET', f'/tasks/changes?since={since}&wait={wait}')
+            response = conn.getresponse()
+            body = response.read()
+            if response.status == 200:
+                since = json.loads(body)['last_seq']
+            polls.append(response.status)
+        except OSError:
+            conn.close()
+            conn = HTTPConnection('127.0.0.1', port, timeout=wait + 60)
+            polls.append('error')
+    conn.close()
+
+
+def worker(port, seed_tasks, write_ratio, deadline, results):
+    rng = random.Random()
+    conn = HTTPConnection('127.0.0.1', port, timeout=60)
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < write_ratio:
+            method, url, body = 'PUT', f'/tasks/{rng.randint(1, seed_tasks)}', {'title': f'Edit {rng.random()}'}
+        elif roll < (1 + write_ratio) / 2:
+            method, url, body = 'GET', '/tasks?limit=20&sort_by=deadline', None
+        else:
+            method, url, body = 'GET', f'/tasks/{rng.randint(1, seed_tasks)}', None
+        started = time.perf_counter()
+        try:
+            conn.request(method, url, body=json.dumps(body) if body else None,
+                         headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except OSError:
+            conn.close()
+            conn = HTTPConnection('127.0.0.1', port, timeout=60)
+            status = 'error'
+        results.append((method, status, (time.perf_counter() - started) * 1000))
+    conn.close()
+
+
+def run(name, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'tasks.db'), args.tasks)
+        port, shutdown = serve_wsgi(app, args.threads) if name == 'wsgi' else serve_asgi(app)
+
+        results, polls = [], []
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=poller, args=(port, deadline, args.wait, polls))
+                   for _ in range(args.pollers)]
+        threads += [threading.Thread(target=worker, args=(port, args.tasks, args.writes, deadline, results))
+                    for _ in range(args.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        shutdown()
+
+    failed = Counter(status for _, status, _ in results if status == 'error' or status >= 500)
+    timings = [ms for _, _, ms in results]
+    if len(timings) >= 2:
+        p50, p95, p99 = (statistics.quantiles(timings, n=100)[i] for i in (49, 94, 98))
+        print(f'{name:<6} {len(timings) / args.seconds:>8.0f}/s {p50:>8.1f}ms {p95:>8.1f}ms {p99:>8.1f}ms '
+              f'{len(polls):>7} failed: {sum(failed.values())} {dict(failed)}')
+    else:
+        print(f'{name:<6} {len(timings)} requests completed')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=16, help='clients sending the request mix')
+    parser.add_argument('--pollers', type=int, default=32, help='clients holding long polls')
+    parser.add_argument('--threads', type=int, default=16, help='threads of the WSGI server')
+    parser.add_argument('--wait', type=int, default=5, help='long poll wait, in seconds')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--tasks', type=int, default=1000, help='tasks seeded before the run')
+    parser.add_argument('--writes', type=float, default=0.1, help='fraction of requests that write')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    print(f'{"mode":<6} {"rate":>10} {"p50":>10} {"p95":>10} {"p99":>10} {"polls":>7}')
+    run('wsgi', args)
+    run('asgi', args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark POST /tasks/bulk against POST /tasks on a file-backed SQLite database.
+
+Also inserts the same rows with plain multi-row INSERT statements, the
+fastest the schema takes them, to tell the endpoint's own work apart from
+the storage: every row updates the filter/sort indexes and fires the search,
+stats and change log triggers. The run fails when POST /tasks/bulk gets
+below --target rows per second (TARGET_ROWS_PER_SECOND by default).
+
+Usage:
+    python benchmarks/bench_bulk_insert.py [--tasks 50000] [--batch-size 1000] [--target 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import PRIORITY_RANKS, category_ids  # noqa: E402
+from config import Config  # noqa: E402
+
+TARGET_ROWS_PER_SECOND = 10000
+
+INSERT_SQL = 'INSERT INTO tasks (title, description, category_id, priority, deadline, created_at, updated_at) VALUES '
+ROW_VALUES = '(?, ?, ?, ?, ?, ?, ?)'
+STATEMENT_ROWS = 1000
+
+
+def make_app(path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        TASKS_BULK_MAX_ITEMS = 100000
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def payload(i):
+    return {
+        'title': f'Task {i}',
+        'description': 'Imported by the bulk insert benchmark',
+        'category': ['Work', 'Home', 'Personal', 'Errands'][i % 4],
+        'priority': ['Low', 'Medium', 'High'][i % 3],
+        'deadline': f'2025-{1 + i % 12:02d}-{1 + i % 28:02d} 12:00:00',
+    }
+
+
+def bench_single(client, count):
+    start = time.perf_counter()
+    for i in range(count):
+        assert client.post('/tasks', json=payload(i)).status_code == 201
+    return count / (time.perf_counter() - start)
+
+
+def bench_bulk(client, count, batch_size):
+    start = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        batch = [payload(i) for i in range(offset, min(offset + batch_size, count))]
+        assert client.post('/tasks/bulk', json=batch).status_code == 201
+    return count / (time.perf_counter() - start)
+
+
+def bench_storage(app, count, batch_size):
+    now = '2025-01-01 00:00:00.000000'
+    with app.app_context():
+        with db.engine.begin() as conn:
+            categories = category_ids(conn, ['Work', 'Home', 'Personal', 'Errands'])
+        rows = [(task['title'], task['description'], categories[task['category']],
+                 PRIORITY_RANKS[task['priority']], task['deadline'] + '.000000', now, now)
+                for task in map(payload, range(count))]
+        start = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            with db.engine.begin() as conn:
+                batch = rows[offset:offset + batch_size]
+                # As many rows per statement as SQLAlchemy's insertmanyvalues sends
+                for first in range(0, len(batch), STATEMENT_ROWS):
+                    chunk = batch[first:first + STATEMENT_ROWS]
+                    conn.exec_driver_sql(INSERT_SQL + ', '.join([ROW_VALUES] * len(chunk)),
+                                         tuple(value for row in chunk for value in row))
+        return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=50000, help='tasks to insert in bulk')
+    parser.add_argument('--batch-size', type=int, default=1000, help='tasks per bulk request')
+    parser.add_argument('--single', type=int, default=500, help='tasks to insert one at a time')
+    parser.add_argument('--target', type=int, default=TARGET_ROWS_PER_SECOND,
+                        help='fail below this many rows/s through POST /tasks/bulk')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'single.db'))
+        single_rate = bench_single(app.test_client(), args.single)
+
+        app = make_app(os.path.join(tmp, 'bulk.db'))
+        bulk_rate = bench_bulk(app.test_client(), args.tasks, args.batch_size)
+
+        storage_rate = bench_storage(make_app(os.path.join(tmp, 'storage.db')), args.tasks, args.batch_size)
+
+    print(f'POST /tasks       {single_rate:>10,.0f} rows/s ({args.single} requests)')
+    print(f'POST /tasks/bulk  {bulk_rate:>10,.0f} rows/s ({args.tasks} rows, batches of {args.batch_size})')
+    print(f'plain INSERT      {storage_rate:>10,.0f} rows/s (same rows, no request handling)')
+    print(f'speedup           {bulk_rate / single_rate:>10.1f}x')
+    print(f'share of storage  {bulk_rate / storage_rate:>10.0%}')
+    if bulk_rate < args.target:
+        print(f'FAIL: below target of {args.target:,} rows/s')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Stress a threaded server with concurrent reads and writes on SQLite.
+
+Runs the app under werkzeug's threaded server on a file-backed database, once
+with the default Config and once with ProductionConfig (WAL, pragmas, pooled
+connections, serialized writes), and drives it with worker threads that mix
+list reads, single reads, creates and updates. Reports throughput, latency
+and the number of failed requests; failures under the default profile are
+usually "database is locked" errors. The response cache is turned off so
+reads hit the database.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--workers 16] [--seconds 10]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.client import HTTPConnection
+
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.cache import NullCache  # noqa: E402
+from config import Config, ProductionConfig  # noqa: E402
+
+
+def make_app(base, path, seed_tasks):
+    class BenchConfig(base):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        TASKS_CACHE_BACKEND = lambda app: NullCache()  # noqa: E731
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        response = app.test_client().post('/tasks/bulk', json=[task(n) for n in range(seed_tasks)])
+        assert response.status_code == 201, response.get_json()
+    return app
+
+
+def task(n):
+    return {'title': f'Task {n}', 'category': random.choice(['Work', 'Home', 'Errands']),
+            'priority': random.choice(['Low', 'Medium', 'High']), 'deadline': '2025-06-01 12:00:00'}
+
+
+def worker(port, seed_tasks, write_ratio, deadline, results):
+    rng = random.Random()
+    conn = HTTPConnection('127.0.0.1', port, timeout=60)
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < write_ratio / 2:
+            method, url, body = 'POST', '/tasks', task(rng.randrange(10**6))
+        elif roll < write_ratio:
+            method, url, body = 'PUT', f'/tasks/{rng.randint(1, seed_tasks)}', {'title': f'Edit {rng.random()}'}
+        elif roll < (1 + write_ratio) / 2:
+            method, url, body = 'GET', '/tasks?limit=20&sort_by=deadline', None
+        else:
+            method, url, body = 'GET', f'/tasks/{rng.randint(1, seed_tasks)}', None
+        started = time.perf_counter()
+        try:
+            conn.request(method, url, body=json.dumps(body) if body else None,
+                         headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except OSError:
+            conn.close()
+            conn = HTTPConnection('127.0.0.1', port, timeout=60)
+            status = 'error'
+        results.append((method, status, (time.perf_counter() - started) * 1000))
+    conn.close()
+
+
+def run(name, base, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(base, os.path.join(tmp, 'tasks.db'), args.tasks)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+
+        results = []
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=worker, args=(server.port, args.tasks, args.writes, deadline, results))
+                   for _ in range(args.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server.shutdown()
+
+    failed = Counter(status for _, status, _ in results if status == 'error' or status >= 500)
+    for method in ('GET', 'POST', 'PUT'):
+        timings = [ms for m, status, ms in results if m == method]
+        if len(timings) < 2:
+            continue
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f'{name:<18} {method:<5} {len(timings) / args.seconds:>8.0f}/s '
+              f'{statistics.median(timings):>7.1f}ms {p95:>7.1f}ms')
+    print(f'{name:<18} total {len(results) / args.seconds:>8.0f}/s  failed: {sum(failed.values())} {dict(failed)}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--tasks', type=int, default=1000, help='tasks seeded before the run')
+    parser.add_argument('--writes', type=float, default=0.3, help='fraction of requests that write')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    print(f'{"profile":<18} {"op":<5} {"rate":>10} {"p50":>9} {"p95":>9}')
+    run('Config', Config, args)
+    run('ProductionConfig', ProductionConfig, args)
+
+
+if __name__ == '__main__':
+    main()
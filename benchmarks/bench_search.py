@@ -0,0 +1,141 @@
+"""Benchmark full-text search latency on GET /tasks?q=... for a large table.
+
+Seeds a file-backed database with synthetic tasks whose words follow a Zipf
+distribution, then times searches for words of decreasing frequency and for
+multi-word queries, alone and combined with filters. Relevance ranking is
+capped at TASKS_SEARCH_MAX_RANKED matches, so the most frequent words should
+cost about as much as rare ones. The response cache is turned off so every
+request runs the query. The run fails when any query's p95 latency is above
+--budget-ms.
+
+Usage:
+    python benchmarks/bench_search.py [--tasks 1000000] [--repeat 50] [--budget-ms 100]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.cache import NullCache  # noqa: E402
+from app.models import PRIORITY_RANKS, category_ids  # noqa: E402
+from config import Config  # noqa: E402
+
+COMMON_WORDS = ('report budget meeting review invoice deploy release fix bug call email plan design test '
+                'migrate backup audit hire onboard train present draft publish order ship refund renew '
+                'schedule clean paint repair garden cook shop pay book travel visit write read').split()
+SYLLABLES = 'ka lo mi ren tu sal vor pe din qua bri mon tel ga ros fi zan dul'.split()
+
+# Highest p95 latency allowed for any query, in milliseconds
+BUDGET_MS = 100
+
+
+def vocabulary(size, rng):
+    """Real words for the most frequent ranks, then made-up ones, without repeats."""
+    words = list(COMMON_WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def queries(words):
+    # Words picked by frequency rank: the most common word, then rarer ones
+    return [
+        f'q={words[0]}',
+        f'q={words[9]}',
+        f'q={words[99]}',
+        f'q={words[999]}',
+        f'q={words[1]}%20{words[2]}',
+        f'q={words[5]}&category=Work',
+        f'q={words[20]}&priority=High&deadline_from=2025-06-01',
+        f'q={words[50]}&sort_by=deadline&order=asc',
+    ]
+
+
+def make_app(path, count, words):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        TASKS_CACHE_BACKEND = lambda app: NullCache()  # noqa: E731
+
+    app = create_app(BenchConfig)
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    # Zipf-distributed word frequencies, as in natural text
+    weights = list(accumulate(1 / rank ** 1.07 for rank in range(1, len(words) + 1)))
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            categories = category_ids(conn, ['Work', 'Home', 'Personal', 'Errands'])
+            for offset in range(0, count, 50000):
+                rows = []
+                for i in range(offset, min(offset + 50000, count)):
+                    rows.append((
+                        ' '.join(rng.choices(words, cum_weights=weights, k=4)).capitalize(),
+                        ' '.join(rng.choices(words, cum_weights=weights, k=12)),
+                        categories[rng.choice(['Work', 'Home', 'Personal', 'Errands'])],
+                        PRIORITY_RANKS[rng.choice(['Low', 'Medium', 'High'])],
+                        str(start + timedelta(minutes=rng.randrange(525600))),
+                        str(start),
+                        str(start),
+                    ))
+                conn.exec_driver_sql(
+                    'INSERT INTO tasks (title, description, category_id, priority, deadline, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--vocabulary', type=int, default=5000, help='distinct words in the corpus')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS, help='fail above this p95 latency')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        words = vocabulary(args.vocabulary, random.Random(7))
+        app = make_app(os.path.join(tmp, 'search.db'), args.tasks, words)
+        print(f'Seeded {args.tasks:,} tasks in {time.perf_counter() - start:.0f}s\n')
+
+        client = app.test_client()
+        over_budget = []
+        print(f'{"query":<50} {"matches":>8} {"p50":>9} {"p95":>9}')
+        for query in queries(words):
+            url = f'/tasks?{query}&limit={args.limit}'
+            response = client.get(url)
+            assert response.status_code == 200, response.get_json()
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            with app.app_context():
+                matches = db.session.execute(db.text(
+                    'SELECT count(*) FROM tasks_fts WHERE tasks_fts MATCH :q'
+                ), {'q': query.split('&')[0][2:].replace('%20', ' ')}).scalar()
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(f'{query:<50} {matches:>8,} {statistics.median(timings):>7.1f}ms {p95:>7.1f}ms')
+            if p95 > args.budget_ms:
+                over_budget.append(query)
+
+    if over_budget:
+        print(f'\nFAIL: p95 above {args.budget_ms:g}ms for {", ".join(over_budget)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Micro-benchmark list serialization: ORM + marshmallow against row tuples.
+
+Each variant fetches every task from an in-memory database and turns it into
+the JSON body of a list response:
+
+    schema    Task instances, tasks_schema.dump, default JSON provider
+    rows      row tuples, task_row_encoder, default JSON provider
+    orjson    row tuples, task_row_encoder, ORJSONProvider (if installed)
+
+Usage:
+    python benchmarks/bench_serialization.py [--sizes 10000 100000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.json import ORJSONProvider, orjson  # noqa: E402
+from app.importer import resolve_categories  # noqa: E402
+from app.models import Task  # noqa: E402
+from app.routes import task_columns  # noqa: E402
+from app.schemas import task_row_encoder, tasks_schema  # noqa: E402
+from config import Config  # noqa: E402
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def seed(count):
+    db.session.execute(db.delete(Task))
+    start = datetime(2025, 1, 1)
+    db.session.execute(insert(Task), resolve_categories([{
+        'title': f'Task {i}',
+        'description': None if i % 5 == 0 else 'Seeded by the serialization benchmark',
+        'category': ['Work', 'Home', 'Personal', 'Errands'][i % 4],
+        'priority': ['Low', 'Medium', 'High'][i % 3],
+        'deadline': start + timedelta(minutes=i),
+    } for i in range(count)]))
+    db.session.commit()
+
+
+def schema_body(provider):
+    tasks = Task.query.all()
+    return provider.dumps({'data': tasks_schema.dump(tasks)}, separators=(',', ':'))
+
+
+def rows_body(provider):
+    rows = db.session.execute(db.select(*task_columns())).all()
+    return provider.dumps({'data': task_row_encoder.dump_many(rows)}, separators=(',', ':'))
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        default = DefaultJSONProvider(app)
+        variants = [('schema', schema_body, default), ('rows', rows_body, default)]
+        if orjson is not None:
+            variants.append(('orjson', rows_body, ORJSONProvider(app)))
+
+        print(f'{"rows":>8} ' + ' '.join(f'{name:>10}' for name, _, _ in variants) + f' {"speedup":>8}')
+        for count in args.sizes:
+            seed(count)
+            assert len({func(provider) for _, func, provider in variants}) == 1
+            timings = [best_of(args.repeat, func, provider) for _, func, provider in variants]
+            print(f'{count:>8} ' + ' '.join(f'{t * 1000:>8.0f}ms' for t in timings)
+                  + f' {timings[0] / timings[-1]:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+"""Reproducible load tests for the task API.
+
+Seeds a file-backed database with a synthetic dataset (dataset.py), drives
+every endpoint with a fixed mix of requests (scenarios.py), either in-process
+through the Flask test client or against a threaded server started for the
+run (runner.py), and reports latency percentiles, throughput and peak memory
+as JSON that can be compared with a stored baseline (report.py).
+
+Usage:
+    python -m benchmarks.loadtest --tasks 100000 --output results.json
+    python -m benchmarks.loadtest --tasks 100000 --baseline baseline.json
+"""
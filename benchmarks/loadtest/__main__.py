@@ -0,0 +1,116 @@
+"""Command line entry point: python -m benchmarks.loadtest --help"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.loadtest import __doc__ as package_doc
+from benchmarks.loadtest.dataset import dataset
+from benchmarks.loadtest.report import compare, failed_scenarios
+from benchmarks.loadtest.runner import PROFILES, make_app, run_inprocess, run_server
+from benchmarks.loadtest.scenarios import SCENARIOS, Workload
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args, mode, scenarios, tmp):
+    """Run one mode on a fresh copy of the dataset, so writes don't carry over."""
+    path = os.path.join(tmp, f'{mode}.db')
+    shutil.copyfile(dataset(args.data_dir, args.tasks, args.seed), path)
+    app = make_app(path, args.profile, args.cache)
+    workload = Workload(args.tasks)
+    if mode == 'inprocess':
+        return run_inprocess(app, workload, scenarios, args.requests, args.seed)
+    return run_server(app, workload, scenarios, args.workers, args.duration, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=package_doc.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=10000, help='size of the seeded dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'task-api-loadtest'),
+                        help='where seeded datasets are kept between runs')
+    parser.add_argument('--mode', choices=['inprocess', 'server', 'both'], default='both')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per scenario in-process')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent clients against the server')
+    parser.add_argument('--duration', type=float, default=10, help='seconds to run against the server')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='default')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                        help='only run these scenarios (repeatable)')
+    parser.add_argument('--output', help='write the results JSON here instead of stdout')
+    parser.add_argument('--baseline', help='fail if the results regress against this results JSON')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    modes = ['inprocess', 'server'] if args.mode == 'both' else [args.mode]
+
+    started = time.perf_counter()
+    dataset(args.data_dir, args.tasks, args.seed)
+    print(f'Dataset of {args.tasks:,} tasks ready in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+    results = {'meta': {
+        'tasks': args.tasks,
+        'seed': args.seed,
+        'profile': args.profile,
+        'cache': args.cache,
+        'requests': args.requests if 'inprocess' in modes else None,
+        'workers': args.workers if 'server' in modes else None,
+        'duration': args.duration if 'server' in modes else None,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in modes:
+            print(f'Running {mode}...', file=sys.stderr)
+            results[mode] = run(args, mode, scenarios, tmp)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    failures = failed_scenarios(results)
+    if failures:
+        print(f'{len(failures)} scenario(s) failed every request:', file=sys.stderr)
+        for failure in failures:
+            print(f'  {failure}', file=sys.stderr)
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(results, baseline, args.tolerance)
+        except ValueError as e:
+            sys.exit(str(e))
+        if regressions:
+            print(f'{len(regressions)} regression(s) against {args.baseline}:', file=sys.stderr)
+            for regression in regressions:
+                print(f'  {regression}', file=sys.stderr)
+            sys.exit(1)
+        print(f'No regressions against {args.baseline}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
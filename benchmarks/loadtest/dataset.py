@@ -0,0 +1,88 @@
+"""Synthetic task datasets.
+
+Values are drawn from a seeded generator, so a (count, seed) pair always
+produces the same table. Built datasets are kept per schema version, so one
+built before a migration is never reused after it. The distributions are
+skewed the way real task lists are: most tasks are Work or Personal, Medium
+priority dominates, titles and descriptions reuse a small vocabulary with Zipf
+word frequencies, and deadlines cluster a few days to weeks after creation,
+sooner for High priority tasks.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+from app import create_app, db
+from app.migrations import MIGRATIONS, upgrade
+from app.models import PRIORITY_RANKS, category_ids
+from config import Config
+
+CATEGORIES = {'Work': 40, 'Personal': 25, 'Home': 20, 'Errands': 10, 'Health': 5}
+PRIORITIES = {'Medium': 50, 'Low': 30, 'High': 20}
+
+# Tasks are created over the year before this date
+REFERENCE_DATE = datetime(2025, 1, 1)
+
+WORDS = ('report budget meeting review invoice deploy release fix bug call email plan design test '
+         'migrate backup audit hire onboard train present draft publish order ship refund renew '
+         'schedule clean paint repair garden cook shop pay book travel visit write read prepare '
+         'update check send finish organize sort file renew cancel confirm follow up team client '
+         'quarterly weekly monthly annual doctor dentist gym groceries laundry car insurance tax').split()
+
+INSERT_SQL = ('INSERT INTO tasks (title, description, category_id, priority, deadline, created_at, updated_at) '
+              'VALUES (?, ?, (SELECT id FROM categories WHERE name = ?), ?, ?, ?, ?)')
+
+_category_weights = list(accumulate(CATEGORIES.values()))
+_priority_weights = list(accumulate(PRIORITIES.values()))
+_word_weights = list(accumulate(1 / rank ** 1.07 for rank in range(1, len(WORDS) + 1)))
+
+
+def words(rng, k):
+    return ' '.join(rng.choices(WORDS, cum_weights=_word_weights, k=k))
+
+
+def generate(count, seed):
+    """Yield task rows in INSERT_SQL column order, with the category by name."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        category = rng.choices(list(CATEGORIES), cum_weights=_category_weights)[0]
+        priority = rng.choices(list(PRIORITIES), cum_weights=_priority_weights)[0]
+        created_at = REFERENCE_DATE - timedelta(seconds=rng.randrange(365 * 86400))
+        days = min(rng.lognormvariate(2, 1), 365)
+        if priority == 'High':
+            days /= 3
+        deadline = (created_at + timedelta(days=days)).replace(second=0, microsecond=0)
+        description = words(rng, rng.randint(8, 20)) if rng.random() < 0.7 else None
+        yield (words(rng, rng.randint(2, 5)).capitalize(), description, category, PRIORITY_RANKS[priority],
+               str(deadline), str(created_at), str(created_at))
+
+
+def build(path, count, seed, batch_size=50000):
+    """Create the database at path and fill it with count generated tasks."""
+    class SeedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        upgrade()
+        rows = generate(count, seed)
+        with db.engine.begin() as conn:
+            category_ids(conn, CATEGORIES)
+            for _ in range(0, count, batch_size):
+                conn.exec_driver_sql(INSERT_SQL, list(islice(rows, batch_size)))
+        db.engine.dispose()
+
+
+def dataset(data_dir, count, seed):
+    """Return the path of the (count, seed) dataset, building it on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'tasks-{count}-{seed}-v{len(MIGRATIONS)}.db')
+    if not os.path.exists(path):
+        # Build under a temporary name so an interrupted run isn't reused
+        partial = path + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        build(partial, count, seed)
+        os.replace(partial, path)
+    return path
@@ -0,0 +1,87 @@
+"""Result summaries and the baseline comparison."""
+import statistics
+
+# Settings that change the numbers; results are only compared when they match
+COMPARABLE = ('tasks', 'seed', 'profile', 'cache', 'requests', 'workers', 'duration')
+
+# p99 is reported but not compared: at the default request counts it rests on
+# the slowest two or three samples and moves too much between runs
+COMPARED_LATENCIES = ('p50_ms', 'p95_ms')
+
+
+def summarize(timings, errors, seconds, **extra):
+    """Latency percentiles and throughput for one scenario's timings (ms)."""
+    if len(timings) > 1:
+        percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    else:
+        percentiles = timings * 99
+    return dict({
+        'requests': len(timings),
+        'errors': errors,
+        'rps': round(len(timings) / seconds, 1),
+        'p50_ms': round(percentiles[49], 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+    }, **extra)
+
+
+def compare(current, baseline, tolerance=0.25, min_delta_ms=1.0, min_delta_kb=256, min_requests=30):
+    """Return a message for each metric that is worse than the baseline.
+
+    Latency and memory regress when they grow by more than `tolerance` and by
+    at least the matching minimum delta, so sub-millisecond jitter on fast
+    endpoints doesn't count. Throughput regresses when it falls by more than
+    `tolerance`; against the server only the total is compared, since each
+    scenario's share of it is fixed by its weight. Any new error response is a
+    regression. Results with fewer than `min_requests` requests on either
+    side are skipped. Raises ValueError when the two runs used different
+    settings.
+    """
+    mismatched = [key for key in COMPARABLE if current['meta'].get(key) != baseline['meta'].get(key)]
+    if mismatched:
+        details = ', '.join(f'{key}={baseline["meta"].get(key)!r} vs {current["meta"].get(key)!r}'
+                            for key in mismatched)
+        raise ValueError(f'Baseline was recorded with different settings: {details}')
+
+    regressions = []
+    for mode in ('inprocess', 'server'):
+        if mode not in baseline or mode not in current:
+            continue
+        pairs = [(name, base, current[mode]['scenarios'].get(name))
+                 for name, base in baseline[mode]['scenarios'].items()]
+        if 'total' in baseline[mode]:
+            pairs.append(('total', baseline[mode]['total'], current[mode]['total']))
+        for name, base, result in pairs:
+            if result is None:
+                continue
+            label = f'{mode} {name}'
+            if result['errors'] > base['errors']:
+                regressions.append(f'{label}: errors {base["errors"]} -> {result["errors"]}')
+            if min(result['requests'], base['requests']) < min_requests:
+                continue
+            for metric in COMPARED_LATENCIES:
+                if (result[metric] > base[metric] * (1 + tolerance)
+                        and result[metric] - base[metric] >= min_delta_ms):
+                    regressions.append(f'{label}: {metric} {base[metric]} -> {result[metric]}')
+            if (mode == 'inprocess' or name == 'total') and result['rps'] < base['rps'] * (1 - tolerance):
+                regressions.append(f'{label}: rps {base["rps"]} -> {result["rps"]}')
+            if 'peak_memory_kb' in base:
+                grown = result['peak_memory_kb'] - base['peak_memory_kb']
+                if result['peak_memory_kb'] > base['peak_memory_kb'] * (1 + tolerance) and grown >= min_delta_kb:
+                    regressions.append(f'{label}: peak_memory_kb {base["peak_memory_kb"]} -> '
+                                       f'{result["peak_memory_kb"]}')
+    return regressions
+
+
+def failed_scenarios(results):
+    """Return a message for each scenario in which every request failed.
+
+    Such a run measured nothing but error responses, usually because the
+    app and the dataset disagree, so it fails even without a baseline.
+    """
+    failures = []
+    for mode in ('inprocess', 'server'):
+        for name, result in results.get(mode, {}).get('scenarios', {}).items():
+            if result['requests'] and result['errors'] >= result['requests']:
+                failures.append(f'{mode} {name}: all {result["requests"]} requests failed')
+    return failures
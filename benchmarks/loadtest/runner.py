@@ -0,0 +1,128 @@
+"""Drive the scenarios in-process or against a threaded server."""
+import json
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from http.client import HTTPConnection
+from itertools import accumulate
+
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.cache import NullCache
+from benchmarks.loadtest.report import summarize
+from config import Config, ProductionConfig
+
+PROFILES = {'default': Config, 'production': ProductionConfig}
+
+
+def make_app(path, profile='default', cache=False):
+    class LoadTestConfig(PROFILES[profile]):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        if not cache:
+            TASKS_CACHE_BACKEND = lambda app: NullCache()  # noqa: E731
+
+    return create_app(LoadTestConfig)
+
+
+def send(client, request):
+    """Send a request through the test client and read the whole body."""
+    response = client.open(request.path, method=request.method, json=request.json, data=request.data,
+                           content_type=request.content_type)
+    response.get_data()
+    return response.status_code
+
+
+def run_inprocess(app, workload, scenarios, requests, seed, memory_requests=5):
+    """Time `requests` requests per scenario, one scenario after another.
+
+    Peak memory comes from a few more requests run under tracemalloc after
+    the timed ones, so tracing doesn't slow the timings down.
+    """
+    client = app.test_client()
+    results = {}
+    for scenario in scenarios:
+        rng = random.Random(f'{seed}-{scenario.name}')
+        send(client, scenario.build(workload, rng))  # warm up
+
+        timings, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            request = scenario.build(workload, rng)
+            request_started = time.perf_counter()
+            status = send(client, request)
+            timings.append((time.perf_counter() - request_started) * 1000)
+            errors += status >= 400
+        seconds = time.perf_counter() - started
+
+        tracemalloc.start()
+        for _ in range(memory_requests):
+            send(client, scenario.build(workload, rng))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[scenario.name] = summarize(timings, errors, seconds, peak_memory_kb=peak // 1024)
+    return {'scenarios': results}
+
+
+def run_server(app, workload, scenarios, workers, duration, seed):
+    """Run weighted random requests from `workers` threads for `duration` seconds.
+
+    The app is served by werkzeug's threaded server in this process, so the
+    reported peak RSS covers the server, the workers and any earlier run.
+    """
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    weights = list(accumulate(scenario.weight for scenario in scenarios))
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    failures = []
+
+    def worker(index):
+        rng = random.Random(f'{seed}-worker-{index}')
+        conn = HTTPConnection('127.0.0.1', server.port, timeout=60)
+        try:
+            while time.perf_counter() < deadline:
+                scenario = rng.choices(scenarios, cum_weights=weights)[0]
+                request = scenario.build(workload, rng)
+                if request.json is not None:
+                    body, content_type = json.dumps(request.json), 'application/json'
+                else:
+                    body, content_type = request.data, request.content_type
+                headers = {'Content-Type': content_type} if content_type else {}
+                started = time.perf_counter()
+                conn.request(request.method, request.path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                timings[scenario.name].append((time.perf_counter() - started) * 1000)
+                errors[scenario.name] += response.status >= 400
+        except Exception as exc:  # re-raised from the main thread below
+            failures.append(exc)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    started = time.perf_counter()
+    deadline = started + duration
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+    server.shutdown()
+    server.server_close()
+    if failures:
+        raise failures[0]
+
+    all_timings = [ms for name in timings for ms in timings[name]]
+    return {
+        'total': summarize(all_timings, sum(errors.values()), seconds),
+        'scenarios': {scenario.name: summarize(timings[scenario.name], errors[scenario.name], seconds)
+                      for scenario in scenarios if timings[scenario.name]},
+        # Linux reports ru_maxrss in KiB
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
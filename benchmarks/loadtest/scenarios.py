@@ -0,0 +1,138 @@
+"""The requests each load test sends.
+
+Every endpoint has a scenario. A scenario builds one request from a seeded
+generator; its weight sets how often the server run picks it relative to the
+others. Reads and updates target the lower ids of the seeded table and
+deletes consume ids from the top, so no request hits a task that an earlier
+one removed.
+"""
+import json
+import threading
+from collections import namedtuple
+from datetime import timedelta
+from itertools import islice
+
+from benchmarks.loadtest.dataset import CATEGORIES, PRIORITIES, REFERENCE_DATE, WORDS
+
+Request = namedtuple('Request', 'method path json data content_type', defaults=(None, None, None))
+Scenario = namedtuple('Scenario', 'name weight build')
+
+
+class Workload:
+    """Request parameters for one run over a table of `tasks` seeded tasks."""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        # The top half of the table is reserved for deletes
+        self.readable = max(tasks // 2, 1)
+        self._deletable = iter(range(tasks, self.readable, -1))
+        self._lock = threading.Lock()
+
+    def task_id(self, rng):
+        return rng.randint(1, self.readable)
+
+    def delete_ids(self, n):
+        with self._lock:
+            ids = list(islice(self._deletable, n))
+        if len(ids) < n:
+            raise RuntimeError(f'Ran out of tasks to delete; seed more than {self.tasks} tasks '
+                               'or shorten the run')
+        return ids
+
+
+def task_payload(rng):
+    deadline = REFERENCE_DATE + timedelta(minutes=rng.randrange(60 * 24 * 90))
+    return {
+        'title': ' '.join(rng.sample(WORDS, 3)).capitalize(),
+        'description': ' '.join(rng.sample(WORDS, 10)),
+        'category': rng.choice(list(CATEGORIES)),
+        'priority': rng.choice(list(PRIORITIES)),
+        'deadline': deadline.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def deadline_range(rng, days):
+    start = REFERENCE_DATE - timedelta(days=rng.randrange(365))
+    end = start + timedelta(days=days)
+    return f'deadline_from={start:%Y-%m-%d}&deadline_to={end:%Y-%m-%d}'
+
+
+def list_tasks(workload, rng):
+    return Request('GET', '/tasks?limit=20')
+
+
+def list_filtered(workload, rng):
+    return Request('GET', f'/tasks?category={rng.choice(list(CATEGORIES))}&priority={rng.choice(list(PRIORITIES))}'
+                          f'&{deadline_range(rng, 30)}&sort_by=deadline&order=asc&limit=20')
+
+
+def list_sorted(workload, rng):
+    return Request('GET', f'/tasks?sort_by={rng.choice(["title", "priority", "deadline"])}&order=asc&limit=100')
+
+
+def search(workload, rng):
+    # Rarer words match fewer tasks; skip the handful that match most of them
+    return Request('GET', f'/tasks?q={rng.choice(WORDS[10:])}&limit=20')
+
+
+def get_task(workload, rng):
+    return Request('GET', f'/tasks/{workload.task_id(rng)}')
+
+
+def stats(workload, rng):
+    return Request('GET', f'/tasks/stats?category={rng.choice(list(CATEGORIES))}')
+
+
+def export(workload, rng):
+    # One category over a week keeps the export to a bounded slice of the table
+    return Request('GET', f'/tasks/export?category=Health&{deadline_range(rng, 7)}')
+
+
+def create_task(workload, rng):
+    return Request('POST', '/tasks', json=task_payload(rng))
+
+
+def update_task(workload, rng):
+    return Request('PUT', f'/tasks/{workload.task_id(rng)}', json={'title': f'Updated {rng.random():.6f}'})
+
+
+def delete_task(workload, rng):
+    return Request('DELETE', f'/tasks/{workload.delete_ids(1)[0]}')
+
+
+def bulk_create(workload, rng):
+    return Request('POST', '/tasks/bulk', json=[task_payload(rng) for _ in range(50)])
+
+
+def bulk_update(workload, rng):
+    # Duplicate ids are rejected, so sample without replacement
+    ids = rng.sample(range(1, workload.readable + 1), min(50, workload.readable))
+    return Request('PATCH', '/tasks/bulk', json=[{'id': task_id, 'priority': rng.choice(list(PRIORITIES))}
+                                                 for task_id in ids])
+
+
+def bulk_delete(workload, rng):
+    return Request('DELETE', '/tasks/bulk', json=workload.delete_ids(10))
+
+
+def import_ndjson(workload, rng):
+    lines = ''.join(json.dumps(task_payload(rng)) + '\n' for _ in range(200))
+    return Request('POST', '/tasks/import', data=lines.encode(), content_type='application/x-ndjson')
+
+
+SCENARIOS = [
+    Scenario('list', 20, list_tasks),
+    Scenario('list_filtered', 15, list_filtered),
+    Scenario('list_sorted', 5, list_sorted),
+    Scenario('search', 10, search),
+    Scenario('get', 20, get_task),
+    Scenario('stats', 5, stats),
+    Scenario('export', 1, export),
+    Scenario('create', 8, create_task),
+    Scenario('update', 8, update_task),
+    Scenario('delete', 3, delete_task),
+    Scenario('bulk_create', 1, bulk_create),
+    Scenario('bulk_update', 1, bulk_update),
+    Scenario('bulk_delete', 1, bulk_delete),
+    Scenario('import', 1, import_ndjson),
+]
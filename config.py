@@ -5,6 +5,83 @@ class Config:
     # SQLite database
     SQLALCHEMY_DATABASE_URI = 'sqlite:///tasks.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Serialize JSON responses with orjson when it is installed
+    ORJSON_PROVIDER = True
+
+    # Pagination for GET /tasks
+    TASKS_PAGE_SIZE = 100
+    TASKS_MAX_PAGE_SIZE = 1000
+
+    # GET /tasks?q=... sorted by relevance ranks at most this many of the
+    # most recently created matches
+    TASKS_SEARCH_MAX_RANKED = 1000
+
+    # Largest array accepted by the /tasks/bulk endpoints
+    TASKS_BULK_MAX_ITEMS = 10000
+
+    # Rows fetched from the database and written per chunk by GET /tasks/export
+    TASKS_EXPORT_CHUNK_SIZE = 1000
+
+    # Rows per transaction for task imports, and how many rejected rows
+    # POST /tasks/import returns
+    TASKS_IMPORT_BATCH_SIZE = 5000
+    TASKS_IMPORT_MAX_REPORTED_ERRORS = 100
+
+    # Response cache for GET /tasks and GET /tasks/<id>. TASKS_CACHE_BACKEND
+    # is None for the in-process LRU cache, or a callable taking the app and
+    # returning an app.cache.CacheBackend (app.cache.NullCache turns caching off)
+    TASKS_CACHE_BACKEND = None
+    TASKS_CACHE_MAX_ENTRIES = 1024
+    TASKS_CACHE_TTL = 60
     
+    # GET /tasks/changes: longest long-poll wait and event stream, and how
+    # often waiters recheck for writes made by other processes (seconds)
+    TASKS_CHANGES_MAX_WAIT = 30
+    TASKS_CHANGES_STREAM_SECONDS = 300
+    TASKS_CHANGES_RECHECK_INTERVAL = 5
+
+    # PRAGMA name -> value, applied to every new SQLite connection
+    SQLITE_PRAGMAS = {}
+
+    # Run writes one at a time under an in-process lock, each in a
+    # BEGIN IMMEDIATE transaction (see app.database)
+    SQLITE_SERIALIZE_WRITES = False
+
+    # Request instrumentation (app.metrics): Server-Timing headers and
+    # Prometheus metrics at /metrics. Off by default
+    METRICS_ENABLED = False
+    METRICS_SLOW_QUERY_MS = 100
+    # Runs of the same statement in one request that get flagged as N+1
+    METRICS_N_PLUS_ONE_THRESHOLD = 10
+    # Latency histogram bucket bounds, in seconds
+    METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+    # ASGI mode (app.asgi): threads running the requests passed on to the
+    # Flask app, such as bulk writes, export and import. Requests beyond
+    # this wait for a free thread
+    ASGI_DELEGATE_THREADS = 16
+
     # Secret key for session management
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'local_secret_key'
\ No newline at end of file
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'local_secret_key'
+
+class ProductionConfig(Config):
+    # Pool sized for concurrent readers; WAL lets them run alongside the writer
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 16,
+        'max_overflow': 0,
+        'pool_timeout': 30,
+        'connect_args': {'check_same_thread': False},
+    }
+
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        # Durable at checkpoints rather than at every commit; safe with WAL
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -65536,  # 64 MiB
+        'mmap_size': 268435456,  # 256 MiB
+        'temp_store': 'MEMORY',
+    }
+
+    SQLITE_SERIALIZE_WRITES = True
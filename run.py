@@ -1,8 +1,9 @@
-from app import create_app, db
+from app import create_app
+from app.migrations import upgrade
 
 app = create_app()
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        upgrade()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from http import HTTPStatus
+
+import pytest
+from werkzeug.test import Client, run_wsgi_app
+from app import create_app, db
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+def file_config(path, base=TestConfig, **settings):
+    """Return a subclass of base for testing, with a SQLite file database at path.
+
+    For tests where other threads, or the async engine, have to see the same
+    database: each connection to an in-memory one gets its own.
+    """
+    return type(f'File{base.__name__}', (base,),
+                dict(settings, TESTING=True, SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}'))
+
+@contextmanager
+def wsgi_test_client(config_class):
+    app = create_app(config_class)
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+class BridgeClient(Client):
+    """Test client whose application is the Flask app but whose requests go to bridge."""
+
+    def __init__(self, application, bridge):
+        super().__init__(application)
+        self.bridge = bridge
+
+    def run_wsgi_app(self, environ, buffered=False):
+        return run_wsgi_app(self.bridge, environ, buffered=buffered)
+
+@contextmanager
+def asgi_test_client(config_class):
+    """Test client for app.asgi, with the Flask app's context pushed.
+
+    Requests are made with the usual werkzeug test client API and sent
+    through the ASGI interface, on an event loop running in another thread.
+    """
+    from app.asgi import create_asgi_app
+
+    asgi_app = create_asgi_app(config_class)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    def bridge(environ, start_response):
+        body = environ['wsgi.input'].read()
+        headers = [(key[5:].replace('_', '-').lower().encode('latin-1'), value.encode('latin-1'))
+                   for key, value in environ.items() if key.startswith('HTTP_')]
+        for key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            if environ.get(key):
+                headers.append((key.replace('_', '-').lower().encode('latin-1'), environ[key].encode('latin-1')))
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': environ['REQUEST_METHOD'],
+            'scheme': environ['wsgi.url_scheme'],
+            'path': environ['PATH_INFO'].encode('latin-1').decode('utf-8'),
+            'query_string': environ['QUERY_STRING'].encode('latin-1'),
+            'root_path': '',
+            'headers': headers,
+            'server': (environ['SERVER_NAME'], int(environ['SERVER_PORT'])),
+            'client': ('127.0.0.1', 0),
+        }
+
+        async def call():
+            messages = [{'type': 'http.request', 'body': body}]
+            sent = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await asyncio.Event().wait()
+
+            async def send(message):
+                sent.append(message)
+
+            await asgi_app(scope, receive, send)
+            return sent
+
+        sent = asyncio.run_coroutine_threadsafe(call(), loop).result()
+        status = sent[0]['status']
+        start_response(f'{status} {HTTPStatus(status).phrase}',
+                       [(name.decode('latin-1'), value.decode('latin-1')) for name, value in sent[0]['headers']])
+        return [message.get('body', b'') for message in sent[1:]]
+
+    try:
+        with asgi_app.flask_app.app_context():
+            db.create_all()
+            yield BridgeClient(asgi_app.flask_app, bridge)
+            db.session.remove()
+            db.drop_all()
+    finally:
+        asyncio.run_coroutine_threadsafe(asgi_app.engine.dispose(), loop).result()
+        asgi_app.delegate_pool.shutdown()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+@pytest.fixture
+def client():
+    # The database URI must be set before create_app so the engine never
+    # touches instance/tasks.db
+    with wsgi_test_client(TestConfig) as client:
+        yield client
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from tests.conftest import TestConfig, asgi_test_client, file_config
+
+pytest.importorskip('aiosqlite')
+
+from app.asgi import create_asgi_app  # noqa: E402
+from config import ProductionConfig  # noqa: E402
+
+def task_payload(title='Task'):
+    return {'title': title, 'category': 'Work', 'priority': 'High', 'deadline': '2025-06-01 12:00:00'}
+
+@pytest.fixture
+def client(tmp_path):
+    config = file_config(tmp_path / 'tasks.db', TASKS_CHANGES_RECHECK_INTERVAL=0.1, TASKS_CHANGES_STREAM_SECONDS=0.5)
+    with asgi_test_client(config) as client:
+        yield client
+
+def test_in_memory_database_is_rejected():
+    with pytest.raises(ValueError, match='file database'):
+        create_asgi_app(TestConfig)
+
+@pytest.mark.parametrize('write', ['single', 'bulk'])
+def test_long_poll_wakes_on_commit(client, write):
+    # Single writes commit on the async engine, bulk ones in the delegated Flask app
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        result['body'] = client.get('/tasks/changes?since=0&wait=10').get_json()
+        result['seconds'] = time.monotonic() - started
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    time.sleep(0.3)
+    if write == 'single':
+        client.post('/tasks', json=task_payload('Wake up'))
+    else:
+        client.post('/tasks/bulk', json=[task_payload('Wake up')])
+    poller.join(timeout=10)
+
+    assert [change['task']['title'] for change in result['body']['changes']] == ['Wake up']
+    assert result['seconds'] < 5
+
+def test_event_stream(client):
+    client.post('/tasks', json=task_payload('First'))
+    client.post('/tasks', json=task_payload('Second'))
+
+    response = client.get('/tasks/changes?since=0', headers={'Accept': 'text/event-stream'})
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert body.startswith('id: 1\nevent: create\ndata: {')
+    assert 'id: 2\nevent: create\n' in body
+    assert ': keep-alive' in body
+
+def test_concurrent_writes_with_production_profile(tmp_path):
+    with asgi_test_client(file_config(tmp_path / 'tasks.db', ProductionConfig)) as client:
+        statuses = []
+
+        def create(n):
+            statuses.append(client.post('/tasks', json=task_payload(f'Task {n}')).status_code)
+
+        threads = [threading.Thread(target=create, args=(n,)) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert statuses == [201] * 20
+        assert client.get('/tasks/stats').get_json()['total'] == 20
+
+def test_delegated_requests_share_a_bounded_pool(tmp_path):
+    with asgi_test_client(file_config(tmp_path / 'tasks.db', ASGI_DELEGATE_THREADS=2)) as client:
+        statuses = []
+
+        def create(n):
+            statuses.append(client.post('/tasks/bulk', json=[task_payload(f'Task {n}')]).status_code)
+
+        threads = [threading.Thread(target=create, args=(n,)) for n in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert statuses == [201] * 10
+        assert len([thread for thread in threading.enumerate() if thread.name.startswith('asgi-delegate')]) <= 2
+
+def test_server_timing_counts_async_queries(tmp_path):
+    with asgi_test_client(file_config(tmp_path / 'tasks.db', METRICS_ENABLED=True)) as client:
+        client.post('/tasks', json=task_payload())
+        response = client.get('/tasks/1')
+        assert response.status_code == 200
+        assert 'desc="1 queries"' in response.headers['Server-Timing']
+        body = client.get('/metrics').get_data(as_text=True)
+        assert 'http_requests_total{method="GET",route="/tasks/<int:id>",status="200"} 1' in body
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+from app import create_app, db
+from app.cache import MemoryCache, NullCache
+from app.models import Task
+from tests.conftest import TestConfig
+
+def add_task(title='Task1'):
+    task = Task(title=title, description='Desc', category='Work', priority='High',
+                deadline=datetime(2025, 12, 31, 23, 59, 59))
+    db.session.add(task)
+    db.session.commit()
+    return task
+
+def test_get_tasks_is_cached_until_a_write(client):
+    add_task()
+    first = client.get('/tasks?category=Work&order=desc')
+    assert first.status_code == 200
+    assert first.headers['ETag']
+
+    # Parameter order is normalized away
+    second = client.get('/tasks?order=desc&category=Work')
+    assert second.get_data() == first.get_data()
+    assert client.get('/tasks/cache').get_json()['hits'] == 1
+
+    client.post('/tasks', json={'title': 'Task2', 'category': 'Work', 'priority': 'Low',
+                                'deadline': '2025-12-31'})
+    third = client.get('/tasks?category=Work&order=desc')
+    assert len(third.get_json()['data']) == 2
+    assert third.headers['ETag'] != first.headers['ETag']
+
+@pytest.mark.parametrize('param', ['sort_by', 'order', 'limit'])
+def test_rejected_empty_params_are_not_served_from_cache(client, param):
+    add_task()
+    assert client.get('/tasks').status_code == 200
+    assert client.get(f'/tasks?{param}=').status_code == 400
+
+def test_if_none_match_returns_304(client):
+    task = add_task()
+    response = client.get(f'/tasks/{task.id}')
+    etag = response.headers['ETag']
+
+    response = client.get(f'/tasks/{task.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+    client.put(f'/tasks/{task.id}', json={'title': 'Renamed'})
+    response = client.get(f'/tasks/{task.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'Renamed'
+
+def test_errors_are_not_cached(client):
+    assert client.get('/tasks/1').status_code == 404
+    add_task()
+    assert client.get('/tasks/1').status_code == 200
+
+def test_cache_stats(client):
+    add_task()
+    client.get('/tasks')
+    client.get('/tasks')
+    client.delete('/tasks/1')
+    client.get('/tasks')
+    stats = client.get('/tasks/cache').get_json()
+    assert (stats['hits'], stats['misses'], stats['version']) == (1, 2, 1)
+    assert stats['size'] == 2
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryCache(max_entries=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats() == {'size': 2, 'evictions': 1}
+
+def test_memory_cache_ttl():
+    now = [0]
+    cache = MemoryCache(ttl=10, clock=lambda: now[0])
+    cache.set('a', 1)
+    now[0] = 9
+    assert cache.get('a') == 1
+    now[0] = 10
+    assert cache.get('a') is None
+    assert cache.stats()['evictions'] == 1
+
+def test_custom_cache_backend():
+    backends = []
+
+    class BackendConfig(TestConfig):
+        @staticmethod
+        def TASKS_CACHE_BACKEND(app):
+            backends.append(MemoryCache(max_entries=1))
+            return backends[-1]
+
+    app = create_app(BackendConfig)
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get('/tasks?category=Work')
+        client.get('/tasks?category=Home')
+        assert backends[0].stats() == {'size': 1, 'evictions': 1}
+        db.drop_all()
+
+def test_null_cache_backend():
+    class NoCacheConfig(TestConfig):
+        TASKS_CACHE_BACKEND = lambda app: NullCache()
+
+    app = create_app(NoCacheConfig)
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get('/tasks')
+        client.get('/tasks')
+        assert client.get('/tasks/cache').get_json()['hits'] == 0
+        db.drop_all()
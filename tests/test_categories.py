@@ -0,0 +1,162 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from app import create_app, db
+from app import migrations
+from app.migrations import MigrationError, upgrade
+from app.models import Category, Task
+from app.stats import stats_differences
+from tests.conftest import file_config
+
+OLD_TASKS = (
+    'CREATE TABLE tasks (id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, description TEXT, '
+    'category VARCHAR(50) NOT NULL, priority VARCHAR(10) NOT NULL, deadline DATETIME NOT NULL, '
+    'created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id))'
+)
+OLD_INSERT = ('INSERT INTO tasks (id, title, description, category, priority, deadline, created_at, updated_at) '
+              "VALUES (?, ?, 'Desc', ?, ?, ?, '2025-01-01 00:00:00', '2025-01-01 00:00:00')")
+
+def task_payload(title='Task', category='Work', priority='High'):
+    return {'title': title, 'category': category, 'priority': priority, 'deadline': '2025-06-01 12:00:00'}
+
+def old_database(path, count):
+    conn = sqlite3.connect(path)
+    conn.execute(OLD_TASKS)
+    conn.executemany(OLD_INSERT, [(i, f'Task {i}', ['Work', 'Home', 'Errands'][i % 3],
+                                   ['Low', 'Medium', 'High'][i % 3], f'2025-01-{1 + i % 28:02d} 12:00:00')
+                                  for i in range(1, count + 1)])
+    conn.commit()
+    conn.close()
+
+def schema(path):
+    with sqlite3.connect(path) as conn:
+        tables = [name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                                 "AND name NOT LIKE 'tasks_fts%' ORDER BY name")]
+        columns = {table: conn.execute(f'PRAGMA table_info({table})').fetchall() for table in tables}
+        foreign_keys = {table: conn.execute(f'PRAGMA foreign_key_list({table})').fetchall() for table in tables}
+        indexes = {name: conn.execute(f'PRAGMA index_info({name})').fetchall()
+                   for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name").fetchall()
+    return columns, foreign_keys, indexes, triggers
+
+def test_categories_are_stored_once(client):
+    client.post('/tasks', json=task_payload('First'))
+    client.post('/tasks/bulk', json=[task_payload('Second'), task_payload('Third', category='Home')])
+    client.put('/tasks/1', json={'category': 'Home'})
+    assert sorted(db.session.scalars(db.select(Category.name))) == ['Home', 'Work']
+
+    body = client.get('/tasks?category=Home&sort_by=title&order=asc').get_json()
+    assert [(task['title'], task['category']) for task in body['data']] == [('First', 'Home'), ('Third', 'Home')]
+    assert client.get('/tasks?category=Nowhere').get_json()['data'] == []
+
+def test_category_not_equal(client):
+    client.post('/tasks', json=task_payload('First'))
+    client.post('/tasks', json=task_payload('Second', category='Home'))
+    assert Task.query.filter(Task.category != 'Nope').count() == 2
+    assert [task.title for task in Task.query.filter(Task.category != 'Work')] == ['Second']
+
+def test_unknown_priority_matches_nothing(client):
+    client.post('/tasks', json=task_payload())
+    assert Task.query.filter_by(priority='Urgent').all() == []
+    assert Task.query.filter_by(priority='High').count() == 1
+
+def test_upgrade_matches_models(tmp_path):
+    created = tmp_path / 'created.db'
+    migrated = tmp_path / 'migrated.db'
+    with create_app(file_config(created)).app_context():
+        db.create_all()
+    old_database(migrated, 0)
+    engine = create_engine(f'sqlite:///{migrated}')
+    assert 'normalize_categories_and_priority' in upgrade(engine)
+    engine.dispose()
+
+    assert schema(created) == schema(migrated)
+
+def test_upgrade_keeps_existing_tasks(tmp_path, monkeypatch):
+    path = tmp_path / 'tasks.db'
+    old_database(path, 12)
+    monkeypatch.setattr(migrations, 'BACKFILL_BATCH_SIZE', 5)
+    app = create_app(file_config(path))
+    with app.app_context():
+        upgrade()
+        client = app.test_client()
+        body = client.get('/tasks?sort_by=priority&order=asc&limit=100').get_json()
+        assert [task['priority'] for task in body['data']] == ['Low'] * 4 + ['Medium'] * 4 + ['High'] * 4
+        assert client.get('/tasks/2').get_json()['category'] == 'Errands'
+        assert client.get('/tasks/stats?category=Home').get_json()['total'] == 4
+        assert client.get('/tasks?q=Desc&limit=100').get_json()['data'][0]['title'] == 'Task 1'
+        with db.engine.connect() as conn:
+            assert stats_differences(conn) == []
+
+def test_upgrade_copies_concurrent_writes(tmp_path, monkeypatch):
+    # Writes from a process still on the old schema land between backfill batches
+    path = tmp_path / 'tasks.db'
+    old_database(path, 6)
+    monkeypatch.setattr(migrations, 'BACKFILL_BATCH_SIZE', 2)
+    engine = create_engine(f'sqlite:///{path}')
+    transactions = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def write_between_batches(conn, cursor, statement, parameters, context, executemany):
+        # Each step takes the write lock up front; the third is the second batch
+        if statement == 'BEGIN IMMEDIATE':
+            transactions.append(statement)
+            if len(transactions) == 3:
+                with sqlite3.connect(path) as other:
+                    other.execute("UPDATE tasks SET category = 'Garden', priority = 'High' WHERE id = 1")
+                    other.execute('DELETE FROM tasks WHERE id = 5')
+                    other.execute(OLD_INSERT, (7, 'Task 7', 'Garden', 'Low', '2025-02-01 12:00:00'))
+
+    upgrade(engine)
+    engine.dispose()
+
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute('SELECT tasks.id, categories.name, priority FROM tasks '
+                            'JOIN categories ON categories.id = tasks.category_id ORDER BY tasks.id').fetchall()
+    assert rows == [(1, 'Garden', 3), (2, 'Errands', 3), (3, 'Work', 1), (4, 'Home', 2),
+                    (6, 'Work', 1), (7, 'Garden', 1)]
+
+def test_upgrade_refuses_unknown_priorities(tmp_path):
+    path = tmp_path / 'tasks.db'
+    old_database(path, 3)
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE tasks SET priority = 'high' WHERE id = 1")
+        conn.execute("UPDATE tasks SET priority = ' low ' WHERE id = 2")
+        conn.execute("UPDATE tasks SET priority = 'Urgent' WHERE id = 3")
+    engine = create_engine(f'sqlite:///{path}')
+
+    with pytest.raises(MigrationError, match=r"3 \('Urgent'\)"):
+        upgrade(engine)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT count(*) FROM tasks').fetchone() == (3,)
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'tasks_new'").fetchall() == []
+        conn.execute("UPDATE tasks SET priority = 'MEDIUM' WHERE id = 3")
+
+    assert upgrade(engine) == ['normalize_categories_and_priority', 'drop_priority_category_index']
+    engine.dispose()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT id, priority FROM tasks ORDER BY id').fetchall() == [(1, 3), (2, 1), (3, 2)]
+
+def test_interrupted_swap_keeps_the_old_table(tmp_path):
+    path = tmp_path / 'tasks.db'
+    old_database(path, 4)
+    engine = create_engine(f'sqlite:///{path}')
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def fail_rename(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('ALTER TABLE tasks_new'):
+            raise RuntimeError('interrupted')
+
+    with pytest.raises(RuntimeError):
+        upgrade(engine)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT count(*) FROM tasks').fetchone() == (4,)
+        assert conn.execute('SELECT count(*) FROM tasks_new').fetchone() == (4,)
+
+    event.remove(engine, 'before_cursor_execute', fail_rename)
+    assert upgrade(engine) == ['normalize_categories_and_priority', 'drop_priority_category_index']
+    engine.dispose()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT count(*) FROM tasks').fetchone() == (4,)
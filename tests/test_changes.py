@@ -0,0 +1,164 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import create_app, db
+from app.migrations import upgrade
+from tests.conftest import file_config
+
+def task_payload(title='Task'):
+    return {'title': title, 'category': 'Work', 'priority': 'High', 'deadline': '2025-06-01 12:00:00'}
+
+def changes(client, since, **params):
+    response = client.get('/tasks/changes', query_string=dict(params, since=since))
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+@pytest.fixture
+def file_app(tmp_path):
+    # Waiting requests run in other threads, so use a file rather than one
+    # shared in-memory connection
+    app = create_app(file_config(tmp_path / 'tasks.db', TASKS_CHANGES_RECHECK_INTERVAL=0.1,
+                                 TASKS_CHANGES_STREAM_SECONDS=0.5))
+    with app.app_context():
+        db.create_all()
+    return app
+
+def test_starting_position(client):
+    assert changes(client, None) == {'message': 'Current position', 'changes': [], 'last_seq': 0, 'has_more': False}
+    client.post('/tasks', json=task_payload())
+    assert client.get('/tasks/changes').get_json()['last_seq'] == 1
+
+def test_writes_are_recorded(client):
+    first = client.post('/tasks', json=task_payload('First')).get_json()['task']['id']
+    second = client.post('/tasks', json=task_payload('Second')).get_json()['task']['id']
+    client.put(f'/tasks/{first}', json={'title': 'Renamed'})
+    client.delete(f'/tasks/{second}')
+
+    # Each task keeps only its latest change
+    body = changes(client, 0)
+    assert [(change['seq'], change['op'], change['id']) for change in body['changes']] == [
+        (3, 'update', first), (4, 'delete', second)]
+    assert body['changes'][0]['task']['title'] == 'Renamed'
+    assert body['changes'][1]['task'] is None
+    assert body['last_seq'] == 4
+    assert changes(client, 4)['changes'] == []
+    assert changes(client, 4)['last_seq'] == 4
+
+def test_bulk_writes_and_imports_are_recorded(client):
+    ids = [r['id'] for r in client.post('/tasks/bulk', json=[task_payload() for _ in range(3)]).get_json()['results']]
+    client.patch('/tasks/bulk', json=[{'id': ids[0], 'priority': 'Low'}])
+    client.delete('/tasks/bulk', json=[ids[1]])
+    client.post('/tasks/import', data=b'{"title": "Imported", "category": "Home", "priority": "Low", '
+                                      b'"deadline": "2025-01-01 00:00:00"}\n',
+                content_type='application/x-ndjson')
+
+    ops = {(change['id'], change['op']) for change in changes(client, 0)['changes']}
+    assert ops == {(ids[0], 'update'), (ids[1], 'delete'), (ids[2], 'create'), (ids[2] + 1, 'create')}
+
+def test_paging(client):
+    client.post('/tasks/bulk', json=[task_payload() for _ in range(5)])
+    body = changes(client, 0, limit=2)
+    assert [change['seq'] for change in body['changes']] == [1, 2]
+    assert body['has_more'] is True
+    body = changes(client, body['last_seq'], limit=3)
+    assert [change['seq'] for change in body['changes']] == [3, 4, 5]
+    assert body['has_more'] is False
+
+def test_invalid_parameters(client):
+    assert client.get('/tasks/changes?since=abc').status_code == 400
+    assert client.get('/tasks/changes?since=0&wait=-1').status_code == 400
+    assert client.get('/tasks/changes?since=0&limit=0').status_code == 400
+
+def test_compacted_position_is_gone(client, monkeypatch):
+    for _ in range(5):
+        client.post('/tasks', json=task_payload())
+    monkeypatch.setattr('app.routes.RETENTION', 2)
+    response = client.get('/tasks/changes?since=2')
+    assert response.status_code == 410
+    assert response.get_json()['last_seq'] == 5
+    assert client.get('/tasks/changes?since=3').status_code == 200
+
+def test_old_changes_are_trimmed(client):
+    client.post('/tasks/bulk', json=[task_payload() for _ in range(3)])
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE sqlite_sequence SET seq = 100001 WHERE name = 'task_changes'")
+    client.post('/tasks', json=task_payload())
+    # The new change is 100002, so everything at or below 2 is dropped
+    with db.engine.connect() as conn:
+        assert [row[0] for row in conn.exec_driver_sql('SELECT seq FROM task_changes')] == [3, 100002]
+    assert [change['seq'] for change in changes(client, 2)['changes']] == [3, 100002]
+    assert client.get('/tasks/changes?since=1').status_code == 410
+
+def test_long_poll_wakes_on_commit(file_app):
+    client = file_app.test_client()
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        result['body'] = changes(file_app.test_client(), 0, wait=10)
+        result['seconds'] = time.monotonic() - started
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    time.sleep(0.3)
+    client.post('/tasks', json=task_payload('Wake up'))
+    poller.join(timeout=10)
+
+    assert [change['task']['title'] for change in result['body']['changes']] == ['Wake up']
+    assert result['seconds'] < 5
+
+def test_long_poll_times_out(file_app):
+    started = time.monotonic()
+    body = changes(file_app.test_client(), 0, wait=1)
+    assert body['changes'] == []
+    assert body['last_seq'] == 0
+    assert 1 <= time.monotonic() - started < 3
+
+def test_event_stream(file_app):
+    client = file_app.test_client()
+    client.post('/tasks', json=task_payload('First'))
+    client.post('/tasks', json=task_payload('Second'))
+
+    response = client.get('/tasks/changes?since=0', headers={'Accept': 'text/event-stream'})
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert body.startswith('id: 1\nevent: create\ndata: {')
+    assert 'id: 2\nevent: create\n' in body
+    assert ': keep-alive' in body
+
+    # Reconnecting with Last-Event-ID resumes after that change
+    response = client.get('/tasks/changes', headers={'Accept': 'text/event-stream', 'Last-Event-ID': '1'})
+    assert 'id: 1\n' not in response.get_data(as_text=True)
+
+def test_upgrade_matches_models(tmp_path):
+    created = tmp_path / 'created.db'
+    migrated = tmp_path / 'migrated.db'
+
+    with create_app(file_config(created)).app_context():
+        db.create_all()
+    conn = sqlite3.connect(migrated)
+    conn.execute(
+        'CREATE TABLE tasks (id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, description TEXT, '
+        'category VARCHAR(50) NOT NULL, priority VARCHAR(10) NOT NULL, deadline DATETIME NOT NULL, '
+        'created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id))'
+    )
+    conn.close()
+    engine = create_engine(f'sqlite:///{migrated}')
+    assert 'add_task_changes' in upgrade(engine)
+    engine.dispose()
+
+    def schema(path):
+        with sqlite3.connect(path) as conn:
+            triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+                                    "AND name LIKE 'task_changes%' ORDER BY name").fetchall()
+            columns = conn.execute('PRAGMA table_info(task_changes)').fetchall()
+            autoincrement = conn.execute("SELECT sql LIKE '%AUTOINCREMENT%' FROM sqlite_master "
+                                         "WHERE name = 'task_changes'").fetchone()
+        return triggers, columns, autoincrement
+
+    assert schema(created) == schema(migrated)
+    assert len(schema(created)[0]) == 4
@@ -0,0 +1,98 @@
+import threading
+
+from sqlalchemy import func, select, text
+
+from app import create_app, db
+from app.cache import NullCache
+from app.models import Task
+from app.stats import stats_differences
+from config import ProductionConfig
+from tests.conftest import file_config
+
+WRITERS = 8
+READERS = 4
+WRITES_PER_THREAD = 25
+
+def production_app(path):
+    app = create_app(file_config(path, ProductionConfig, TASKS_CACHE_BACKEND=lambda app: NullCache()))
+    with app.app_context():
+        db.create_all()
+    return app
+
+def payload(n):
+    return {'title': f'Task {n}', 'category': 'Work', 'priority': 'High', 'deadline': '2025-06-01 12:00:00'}
+
+def run_threads(targets):
+    errors = []
+
+    def guard(target):
+        try:
+            target()
+        except Exception as exc:  # reported below rather than lost in the thread
+            errors.append(exc)
+
+    threads = [threading.Thread(target=guard, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+def test_production_pragmas(tmp_path):
+    app = production_app(tmp_path / 'tasks.db')
+    with app.app_context():
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        assert db.session.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+
+def test_concurrent_writes_and_reads(tmp_path):
+    app = production_app(tmp_path / 'tasks.db')
+    with app.app_context():
+        seed = app.test_client().post('/tasks/bulk', json=[payload(n) for n in range(50)])
+        seed_ids = [result['id'] for result in seed.get_json()['results']]
+
+    def writer(worker):
+        def run():
+            client = app.test_client()
+            for n in range(WRITES_PER_THREAD):
+                response = client.post('/tasks', json=payload(n))
+                assert response.status_code == 201, response.get_json()
+                task_id = response.get_json()['task']['id']
+                response = client.put(f'/tasks/{task_id}', json={'priority': 'Low'})
+                assert response.status_code == 200, response.get_json()
+                response = client.put(f'/tasks/{seed_ids[(worker + n) % len(seed_ids)]}',
+                                      json={'title': f'Writer {worker}'})
+                assert response.status_code == 200, response.get_json()
+        return run
+
+    def reader():
+        client = app.test_client()
+        for _ in range(WRITES_PER_THREAD):
+            assert client.get('/tasks?limit=50').status_code == 200
+            assert client.get('/tasks/stats').status_code == 200
+
+    run_threads([writer(worker) for worker in range(WRITERS)] + [reader] * READERS)
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Task)) == 50 + WRITERS * WRITES_PER_THREAD
+        low = db.session.scalar(select(func.count()).select_from(Task).where(Task.priority == 'Low'))
+        assert low == WRITERS * WRITES_PER_THREAD
+        with db.engine.connect() as conn:
+            assert stats_differences(conn) == []
+
+def test_concurrent_bulk_writes_stay_atomic(tmp_path):
+    app = production_app(tmp_path / 'tasks.db')
+
+    def bulk_writer():
+        client = app.test_client()
+        for _ in range(5):
+            response = client.post('/tasks/bulk', json=[payload(n) for n in range(20)])
+            assert response.status_code == 201, response.get_json()
+            ids = [result['id'] for result in response.get_json()['results']]
+            response = client.delete('/tasks/bulk', json=ids[:10])
+            assert response.status_code == 200, response.get_json()
+
+    run_threads([bulk_writer] * WRITERS)
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Task)) == WRITERS * 5 * 10
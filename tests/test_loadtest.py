@@ -0,0 +1,64 @@
+import copy
+import sqlite3
+
+import pytest
+
+from benchmarks.loadtest.dataset import dataset
+from benchmarks.loadtest.report import compare, failed_scenarios, summarize
+from benchmarks.loadtest.runner import make_app, run_inprocess
+from benchmarks.loadtest.scenarios import SCENARIOS, Workload
+
+def results(**scenario):
+    stats = dict(summarize([1.0, 2.0, 3.0, 10.0] * 25, 0, 1.0), peak_memory_kb=100)
+    stats.update(scenario)
+    return {
+        'meta': {'tasks': 1000, 'seed': 42, 'profile': 'default', 'cache': False, 'requests': 100},
+        'inprocess': {'scenarios': {'list': stats}},
+    }
+
+def test_every_scenario_succeeds(tmp_path):
+    app = make_app(dataset(str(tmp_path), 500, seed=1))
+    report = run_inprocess(app, Workload(500), SCENARIOS, requests=3, seed=1, memory_requests=1)
+    assert set(report['scenarios']) == {scenario.name for scenario in SCENARIOS}
+    for name, stats in report['scenarios'].items():
+        assert stats['errors'] == 0, name
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+
+def test_dataset_is_reproducible(tmp_path):
+    first = dataset(str(tmp_path / 'a'), 300, seed=7)
+    second = dataset(str(tmp_path / 'b'), 300, seed=7)
+    rows = []
+    for path in (first, second):
+        with sqlite3.connect(path) as conn:
+            rows.append(conn.execute('SELECT * FROM tasks ORDER BY id').fetchall())
+    assert len(rows[0]) == 300
+    assert rows[0] == rows[1]
+
+def test_compare_flags_regressions():
+    baseline = results()
+    assert compare(results(), baseline) == []
+    current = results(p95_ms=baseline['inprocess']['scenarios']['list']['p95_ms'] * 2, rps=10, errors=1)
+    regressions = compare(current, baseline)
+    assert [message.split(':')[1].split()[0] for message in regressions] == ['errors', 'p95_ms', 'rps']
+
+def test_compare_ignores_noise():
+    baseline = results(p50_ms=0.5, peak_memory_kb=100)
+    # Twice as slow but under a millisecond, and twice the memory but under 256 KB
+    assert compare(results(p50_ms=1.0, peak_memory_kb=200), baseline) == []
+    assert compare(results(p95_ms=100, requests=5), baseline) == []
+
+def test_dataset_is_rebuilt_for_a_new_schema(tmp_path, monkeypatch):
+    first = dataset(str(tmp_path), 100, seed=3)
+    monkeypatch.setattr('benchmarks.loadtest.dataset.MIGRATIONS', [None] * 99)
+    assert dataset(str(tmp_path), 100, seed=3) != first
+
+def test_failed_scenarios():
+    assert failed_scenarios(results()) == []
+    assert failed_scenarios(results(errors=100)) == ['inprocess list: all 100 requests failed']
+
+def test_compare_rejects_other_settings():
+    baseline = results()
+    current = copy.deepcopy(baseline)
+    current['meta']['tasks'] = 1000000
+    with pytest.raises(ValueError, match='tasks'):
+        compare(current, baseline)
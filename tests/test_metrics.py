@@ -0,0 +1,95 @@
+import re
+
+import pytest
+
+from app import create_app, db
+from app.models import Task
+from tests.conftest import TestConfig
+
+class MetricsConfig(TestConfig):
+    METRICS_ENABLED = True
+
+@pytest.fixture
+def app():
+    app = create_app(MetricsConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def server_timing(response):
+    return {name: float(value) for name, value in re.findall(r'(\w+);dur=([\d.]+)', response.headers['Server-Timing'])}
+
+def create(client, n=0):
+    return client.post('/tasks', json={'title': f'Task {n}', 'category': 'Work', 'priority': 'High',
+                                       'deadline': '2025-06-01 12:00:00'})
+
+def test_server_timing_header(app):
+    client = app.test_client()
+    create(client)
+    response = client.get('/tasks')
+    timings = server_timing(response)
+    assert set(timings) == {'db', 'serialize', 'handler'}
+    assert timings['handler'] >= timings['db'] + timings['serialize']
+    assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* queries"', response.headers['Server-Timing'])
+
+    # Served from the response cache, so no queries
+    response = client.get('/tasks')
+    assert 'desc="0 queries"' in response.headers['Server-Timing']
+
+def test_metrics_endpoint(app):
+    client = app.test_client()
+    create(client)
+    client.get('/tasks/1')
+    client.get('/tasks/2')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/tasks/<int:id>"} 2' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/tasks/<int:id>",le="+Inf"} 2' in body
+    assert 'http_requests_total{method="GET",route="/tasks/<int:id>",status="200"} 1' in body
+    assert 'http_requests_total{method="GET",route="/tasks/<int:id>",status="404"} 1' in body
+    assert re.search(r'db_queries_total\{method="POST",route="/tasks"\} [1-9]', body)
+    # Requests for /metrics itself aren't recorded
+    assert 'route="/metrics"' not in client.get('/metrics').get_data(as_text=True)
+
+def test_histogram_buckets_are_cumulative(app):
+    client = app.test_client()
+    for n in range(3):
+        create(client, n)
+    body = client.get('/metrics').get_data(as_text=True)
+    counts = [int(count) for count in re.findall(
+        r'http_request_duration_seconds_bucket\{method="POST",route="/tasks",le="[^"]+"\} (\d+)', body)]
+    assert counts == sorted(counts)
+    assert counts[-1] == 3
+
+def test_flags_n_plus_one_and_slow_queries(caplog):
+    class SlowQueryConfig(MetricsConfig):
+        METRICS_SLOW_QUERY_MS = 0
+
+    app = create_app(SlowQueryConfig)
+
+    @app.route('/n-plus-one')
+    def n_plus_one():
+        for task_id in range(1, 12):
+            db.session.execute(db.select(Task).where(Task.id == task_id)).all()
+        return 'ok'
+
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get('/n-plus-one')
+        body = client.get('/metrics').get_data(as_text=True)
+
+    assert 'db_n_plus_one_requests_total{method="GET",route="/n-plus-one"} 1' in body
+    assert 'db_slow_queries_total{method="GET",route="/n-plus-one"} 11' in body
+    assert any('Possible N+1' in record.getMessage() for record in caplog.records)
+    assert any('Slow query' in record.getMessage() for record in caplog.records)
+
+def test_disabled_by_default(client):
+    assert 'Server-Timing' not in client.get('/tasks').headers
+    assert client.get('/metrics').status_code == 404
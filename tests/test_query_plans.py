@@ -0,0 +1,87 @@
+from datetime import datetime
+from itertools import product
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, event
+from app import db
+from app.migrations import MIGRATIONS, schema_version, upgrade
+from app.models import Task
+from app.routes import SORTABLE_FIELDS
+
+FILTERS = {
+    'category': 'category=Work',
+    'priority': 'priority=High',
+    'deadline_from': 'deadline_from=2025-01-01',
+    'deadline_to': 'deadline_to=2025-12-31',
+}
+
+def filter_combinations():
+    for enabled in product([False, True], repeat=len(FILTERS)):
+        yield [param for param, on in zip(FILTERS.values(), enabled) if on]
+
+def captured_selects(client, url):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM tasks' in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200, response.get_json()
+    return response, statements
+
+def query_plan(statement, parameters):
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    return [row[3] for row in rows]
+
+def assert_indexed(client, url):
+    response, statements = captured_selects(client, url)
+    assert statements
+    for statement, parameters in statements:
+        plan = query_plan(statement, parameters)
+        assert not any(step == 'SCAN tasks' for step in plan), (url, plan)
+        assert not any('TEMP B-TREE' in step for step in plan), (url, plan)
+    return response
+
+@pytest.mark.parametrize('sort_by', SORTABLE_FIELDS)
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_get_tasks_query_plans_use_indexes(client, sort_by, order):
+    db.session.add_all([
+        Task(title=f'Task{i}', category='Work', priority='High', deadline=datetime(2025, 6, 1 + i))
+        for i in range(3)
+    ])
+    db.session.commit()
+
+    for params in filter_combinations():
+        url = '/tasks?' + '&'.join(params + [f'sort_by={sort_by}', f'order={order}', 'limit=1'])
+        cursor = assert_indexed(client, url).get_json()['next_cursor']
+        assert cursor
+        assert_indexed(client, f'{url}&cursor={cursor}')
+
+def test_upgrade_adds_indexes_to_existing_database(client, tmp_path):
+    path = tmp_path / 'tasks.db'
+    conn = sqlite3.connect(path)
+    # Schema of instance/tasks.db before any migrations
+    conn.execute(
+        'CREATE TABLE tasks (id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, description TEXT, '
+        'category VARCHAR(50) NOT NULL, priority VARCHAR(10) NOT NULL, deadline DATETIME NOT NULL, '
+        'created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id))'
+    )
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f'sqlite:///{path}')
+    assert upgrade(engine) == [migration.__name__ for migration in MIGRATIONS]
+    assert upgrade(engine) == []
+    with engine.connect() as conn:
+        assert schema_version(conn) == len(MIGRATIONS)
+        indexes = {row[0] for row in conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks'")}
+    assert {index.name for index in Task.__table__.indexes} <= indexes
+    engine.dispose()
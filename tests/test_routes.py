@@ -1,19 +1,24 @@
 from datetime import datetime
 import pytest
-from app import create_app, db
+from app import db
 from app.models import Task
+from app.schemas import tasks_schema
 from flask import json
+from tests.conftest import TestConfig, asgi_test_client, file_config, wsgi_test_client
 
-@pytest.fixture
-def client():
-    app = create_app()
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    with app.app_context():
-        db.create_all()
-        yield app.test_client()
-        db.session.remove()
-        db.drop_all()
+@pytest.fixture(params=['wsgi', 'asgi'])
+def client(request, tmp_path):
+    # Every test runs against both serving modes
+    if request.param == 'wsgi':
+        with wsgi_test_client(TestConfig) as client:
+            yield client
+        return
+
+    pytest.importorskip('aiosqlite')
+
+    # The async engine and the test's db.session need the same database
+    with asgi_test_client(file_config(tmp_path / 'tasks.db')) as client:
+        yield client
 
 def test_index(client):
     response = client.post('/test')
@@ -88,6 +93,17 @@ def test_get_task_by_id(client):
     assert response.get_json()['title'] == 'Task1'
 
 
+@pytest.mark.parametrize('url', ['/tasks', '/tasks/1'])
+def test_options_lists_allowed_methods(client, url):
+    client.post('/tasks', json={'title': 'Task', 'category': 'Work', 'priority': 'High',
+                                'deadline': '2025-06-01 12:00:00'})
+    response = client.options(url, json={'title': 'Not created', 'category': 'Work', 'priority': 'High',
+                                         'deadline': '2025-06-01 12:00:00'})
+    assert response.status_code == 200
+    assert response.data == b''
+    assert 'GET' in response.headers['Allow']
+    assert Task.query.count() == 1
+
 def test_update_task(client):
     task = Task(title='Task1', description='Desc', category='Work', priority='High', deadline=datetime(2025, 12, 31, 23, 59, 59))
     db.session.add(task)
@@ -124,3 +140,273 @@ def test_delete_task(client):
     assert 'Task deleted successfully' in response.get_json()['message']
 
 
+
+
+def add_tasks(count, **overrides):
+    tasks = []
+    for i in range(count):
+        fields = dict(title=f'Task{i:03d}', description='Desc', category=['Work', 'Home'][i % 2],
+                      priority=['Low', 'Medium', 'High'][i % 3],
+                      deadline=datetime(2025, 1, 1 + i % 28), created_at=datetime(2025, 1, 1, 0, 0, i % 7))
+        fields.update(overrides)
+        tasks.append(Task(**fields))
+    db.session.add_all(tasks)
+    db.session.commit()
+    return tasks
+
+def fetch_all_pages(client, url):
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        body = response.get_json()
+        ids.extend(task['id'] for task in body['data'])
+        pages += 1
+        cursor = body['next_cursor']
+        if not cursor:
+            return ids, pages
+
+@pytest.mark.parametrize('sort_by', ['title', 'category', 'priority', 'deadline', 'created_at'])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_get_tasks_cursor_pagination(client, sort_by, order):
+    add_tasks(25)
+    expected = [task['id'] for task in
+                client.get(f'/tasks?sort_by={sort_by}&order={order}&limit=1000').get_json()['data']]
+    ids, pages = fetch_all_pages(client, f'/tasks?sort_by={sort_by}&order={order}&limit=4')
+    assert ids == expected
+    assert len(ids) == 25
+    assert pages == 7
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_get_tasks_sorted_by_priority_rank(client, order):
+    add_tasks(9)
+    body = client.get(f'/tasks?sort_by=priority&order={order}&limit=1000').get_json()
+    priorities = [task['priority'] for task in body['data']]
+    expected = ['Low'] * 3 + ['Medium'] * 3 + ['High'] * 3
+    assert priorities == (expected if order == 'asc' else expected[::-1])
+
+def test_get_tasks_cursor_pagination_with_filters(client):
+    add_tasks(30)
+    ids, _ = fetch_all_pages(client, '/tasks?category=Work&sort_by=category&order=asc&limit=4')
+    work = Task.query.filter_by(category='Work').order_by(Task.id).all()
+    assert ids == [task.id for task in work]
+
+def test_get_tasks_limit_is_capped(client):
+    client.application.config['TASKS_MAX_PAGE_SIZE'] = 5
+    add_tasks(8)
+    body = client.get('/tasks?limit=100').get_json()
+    assert len(body['data']) == 5
+    assert body['next_cursor'] is not None
+
+def test_get_tasks_invalid_limit(client):
+    response = client.get('/tasks?limit=0')
+    assert response.status_code == 400
+    assert 'Invalid limit' in response.get_json()['message']
+
+def test_get_tasks_invalid_cursor(client):
+    response = client.get('/tasks?cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert 'Invalid cursor' in response.get_json()['message']
+
+def test_get_tasks_cursor_sort_mismatch(client):
+    add_tasks(3)
+    cursor = client.get('/tasks?sort_by=title&limit=1').get_json()['next_cursor']
+    response = client.get(f'/tasks?sort_by=deadline&limit=1&cursor={cursor}')
+    assert response.status_code == 400
+
+def task_payload(**overrides):
+    data = {'title': 'Bulk', 'description': 'Desc', 'category': 'Work',
+            'priority': 'High', 'deadline': '2025-12-31 23:59:59'}
+    data.update(overrides)
+    return data
+
+def test_bulk_create_tasks(client):
+    response = client.post('/tasks/bulk', json=[task_payload(title=f'Bulk{i}') for i in range(3)])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['succeeded'] == 3
+    assert [result['index'] for result in body['results']] == [0, 1, 2]
+    assert [db.session.get(Task, result['id']).title for result in body['results']] == ['Bulk0', 'Bulk1', 'Bulk2']
+
+def test_bulk_create_tasks_atomic_rejects_batch(client):
+    response = client.post('/tasks/bulk', json=[task_payload(), task_payload(priority='Urgent')])
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['failed'] == 1
+    assert body['results'][0]['index'] == 1
+    assert 'priority' in body['results'][0]['errors']
+    assert Task.query.count() == 0
+
+def test_bulk_create_tasks_partial(client):
+    response = client.post('/tasks/bulk?mode=partial',
+                           json=[task_payload(), task_payload(deadline='2025-31-12'), task_payload()])
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body['succeeded'], body['failed']) == (2, 1)
+    assert 'errors' in body['results'][1]
+    assert Task.query.count() == 2
+
+def test_bulk_create_tasks_validates_like_the_schema(client):
+    no_description = task_payload(title='No description')
+    del no_description['description']
+    items = [
+        no_description,
+        task_payload(title='T separator', deadline='2025-01-02T03:04:05', description=None),
+        task_payload(title='Zulu', deadline='2025-01-02T03:04:05Z'),
+        task_payload(deadline='2025-02-30'),
+        task_payload(deadline='２０２５-01-01'),
+        task_payload(deadline='2025-01-02T03:04:05+02:00'),
+        task_payload(title=''),
+        task_payload(priority=['High']),
+        task_payload(description=5),
+        dict(task_payload(), id=7),
+        'not a task',
+    ]
+    response = client.post('/tasks/bulk?mode=partial', json=items)
+    assert response.status_code == 207
+    errors = {result['index']: result['errors'] for result in response.get_json()['results'] if 'errors' in result}
+    # The schema accepts the offset, parse_datetime doesn't
+    assert errors.pop(5)['deadline'][0].startswith('Invalid date format')
+    assert errors == tasks_schema.validate(items)
+    assert sorted(errors) == [3, 4, 6, 7, 8, 9, 10]
+
+    tasks = Task.query.order_by(Task.id).all()
+    assert [(task.title, task.description, task.deadline) for task in tasks] == [
+        ('No description', None, datetime(2025, 12, 31, 23, 59, 59)),
+        ('T separator', None, datetime(2025, 1, 2, 3, 4, 5)),
+        ('Zulu', 'Desc', datetime(2025, 1, 2, 3, 4, 5)),
+    ]
+
+def test_bulk_create_tasks_invalid_body(client):
+    assert client.post('/tasks/bulk', json={'title': 'Not a list'}).status_code == 400
+    assert client.post('/tasks/bulk', json=[]).status_code == 400
+    assert client.post('/tasks/bulk?mode=sometimes', json=[task_payload()]).status_code == 400
+
+def test_bulk_create_tasks_too_many(client):
+    client.application.config['TASKS_BULK_MAX_ITEMS'] = 2
+    response = client.post('/tasks/bulk', json=[task_payload()] * 3)
+    assert response.status_code == 400
+    assert 'Too many items' in response.get_json()['message']
+
+def test_bulk_update_tasks(client):
+    t1, t2 = add_tasks(2)
+    response = client.patch('/tasks/bulk', json=[
+        {'id': t1.id, 'title': 'Renamed'},
+        {'id': t2.id, 'priority': 'High', 'deadline': '2026-01-01'},
+    ])
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Task, t1.id).title == 'Renamed'
+    assert db.session.get(Task, t2.id).priority == 'High'
+    assert db.session.get(Task, t2.id).deadline == datetime(2026, 1, 1)
+
+def test_bulk_update_tasks_atomic_and_partial(client):
+    t1, = add_tasks(1)
+    items = [{'id': t1.id, 'title': 'Renamed'}, {'id': 9999, 'title': 'Missing'}, {'id': t1.id, 'priority': 'Low'}]
+    response = client.patch('/tasks/bulk', json=items)
+    assert response.status_code == 400
+    db.session.expire_all()
+    assert db.session.get(Task, t1.id).title == 'Task000'
+
+    response = client.patch('/tasks/bulk?mode=partial', json=items)
+    assert response.status_code == 207
+    results = response.get_json()['results']
+    assert results[0] == {'index': 0, 'id': t1.id}
+    assert results[1]['errors']['id'] == ['Task not found.']
+    assert results[2]['errors']['id'] == ['Duplicate id in request.']
+    db.session.expire_all()
+    assert db.session.get(Task, t1.id).title == 'Renamed'
+
+def test_bulk_delete_tasks(client):
+    tasks = add_tasks(3)
+    response = client.delete('/tasks/bulk', json=[tasks[0].id, {'id': tasks[1].id}])
+    assert response.status_code == 200
+    assert response.get_json()['succeeded'] == 2
+    assert [task.id for task in Task.query.all()] == [tasks[2].id]
+
+def test_bulk_delete_tasks_partial(client):
+    tasks = add_tasks(2)
+    response = client.delete('/tasks/bulk', json=[tasks[0].id, 9999])
+    assert response.status_code == 400
+    assert Task.query.count() == 2
+
+    response = client.delete('/tasks/bulk?mode=partial', json=[tasks[0].id, 9999])
+    assert response.status_code == 207
+    assert Task.query.count() == 1
+
+def test_export_tasks_ndjson(client):
+    add_tasks(5)
+    response = client.get('/tasks/export?sort_by=title&order=asc')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    # Same content as the marshmallow serialization of GET /tasks
+    listed = client.get('/tasks?sort_by=title&order=asc').get_json()['data']
+    assert rows == listed
+
+def test_export_tasks_csv_with_filters(client):
+    add_tasks(6)
+    client.application.config['TASKS_EXPORT_CHUNK_SIZE'] = 2
+    response = client.get('/tasks/export?format=csv&category=Work&sort_by=title&order=asc')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == 'id,title,description,category,priority,deadline,created_at,updated_at'
+    assert [line.split(',')[1] for line in lines[1:]] == ['Task000', 'Task002', 'Task004']
+
+def test_export_tasks_invalid_params(client):
+    assert client.get('/tasks/export?format=xml').status_code == 400
+    assert client.get('/tasks/export?sort_by=description').status_code == 400
+
+def test_import_tasks_ndjson(client):
+    client.application.config['TASKS_IMPORT_BATCH_SIZE'] = 2
+    lines = [json.dumps(task_payload(title=f'Imported{i}')) for i in range(5)]
+    lines.insert(2, '{not json')
+    lines.insert(4, json.dumps(task_payload(priority='Urgent')))
+    response = client.post('/tasks/import', data='\n'.join(lines) + '\n',
+                           content_type='application/x-ndjson')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['imported'], body['rejected']) == (5, 2)
+    assert [error['line'] for error in body['errors']] == [3, 5]
+    assert 'priority' in body['errors'][1]['errors']
+    assert Task.query.count() == 5
+
+def test_import_tasks_csv_round_trip(client):
+    add_tasks(4)
+    exported = client.get('/tasks/export?format=csv&sort_by=title&order=asc').get_data()
+    db.session.query(Task).delete()
+    db.session.commit()
+
+    response = client.post('/tasks/import', data=exported, content_type='text/csv')
+    assert response.status_code == 200
+    assert response.get_json()['imported'] == 4
+    assert [task.title for task in Task.query.order_by(Task.title)] == ['Task000', 'Task001', 'Task002', 'Task003']
+
+def test_import_tasks_invalid_utf8_reports_progress(client):
+    client.application.config['TASKS_IMPORT_BATCH_SIZE'] = 2
+    lines = [json.dumps(task_payload(title=f'Imported{i}')).encode() for i in range(3)]
+    lines.insert(1, json.dumps(task_payload(title='')).encode())
+    lines.append(b'{"title": "\xff"}')
+    response = client.post('/tasks/import', data=b'\n'.join(lines) + b'\n',
+                           content_type='application/x-ndjson')
+    assert response.status_code == 400
+    body = response.get_json()
+    assert (body['line'], body['imported'], body['rejected']) == (5, 3, 1)
+    assert [error['line'] for error in body['errors']] == [2]
+    assert Task.query.count() == 3
+
+def test_import_tasks_invalid_format(client):
+    assert client.post('/tasks/import?format=xml', data='').status_code == 400
+
+def test_import_tasks_cli(client, tmp_path):
+    source = tmp_path / 'tasks.ndjson'
+    source.write_text('\n'.join([json.dumps(task_payload()), json.dumps(task_payload(title=''))]))
+    runner = client.application.test_cli_runner()
+    result = runner.invoke(args=['tasks', 'import', str(source), '--batch-size', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Imported 1 tasks' in result.output
+    assert Task.query.count() == 1
+    rejected = [json.loads(line) for line in (tmp_path / 'tasks.ndjson.rejected.ndjson').read_text().splitlines()]
+    assert rejected[0]['line'] == 2
+    assert 'title' in rejected[0]['errors']
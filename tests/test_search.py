@@ -0,0 +1,131 @@
+from datetime import datetime
+
+from app import db
+from app.models import Task
+
+def add_task(title, description=None, category='Work', priority='High', deadline=datetime(2025, 6, 1)):
+    task = Task(title=title, description=description, category=category, priority=priority, deadline=deadline)
+    db.session.add(task)
+    db.session.commit()
+    return task
+
+def search(client, query):
+    response = client.get(f'/tasks?{query}')
+    assert response.status_code == 200, response.get_json()
+    return [task['title'] for task in response.get_json()['data']]
+
+def test_search_title_and_description(client):
+    add_task('Buy milk')
+    add_task('Write report', 'Include milk sales figures')
+    add_task('Call plumber')
+    assert sorted(search(client, 'q=milk')) == ['Buy milk', 'Write report']
+    assert search(client, 'q=plumber') == ['Call plumber']
+    assert search(client, 'q=milk%20report') == ['Write report']
+
+def test_search_ranks_by_relevance(client):
+    add_task('Quarterly budget', 'Budget review for the budget committee')
+    add_task('Team lunch', 'Ask about the budget')
+    add_task('Budget', 'Budget budget budget')
+    assert search(client, 'q=budget') == ['Budget', 'Quarterly budget', 'Team lunch']
+
+def test_search_combines_with_filters(client):
+    add_task('Fix bug', category='Work', deadline=datetime(2025, 1, 1))
+    add_task('Fix bike', category='Home', deadline=datetime(2025, 1, 1))
+    add_task('Fix roof', category='Home', deadline=datetime(2026, 1, 1))
+    assert search(client, 'q=fix&category=Home&deadline_to=2025-12-31') == ['Fix bike']
+    assert search(client, 'q=fix&category=Home&sort_by=deadline&order=desc') == ['Fix roof', 'Fix bike']
+
+def test_search_follows_updates_and_deletes(client):
+    task = add_task('Buy milk')
+    client.put(f'/tasks/{task.id}', json={'title': 'Buy bread'})
+    assert search(client, 'q=milk') == []
+    assert search(client, 'q=bread') == ['Buy bread']
+
+    client.delete(f'/tasks/{task.id}')
+    assert search(client, 'q=bread') == []
+
+def test_search_includes_bulk_writes(client):
+    client.post('/tasks/bulk', json=[
+        {'title': f'Imported {i}', 'category': 'Work', 'priority': 'Low', 'deadline': '2025-01-01'}
+        for i in range(3)
+    ])
+    assert len(search(client, 'q=imported')) == 3
+
+def test_search_relevance_is_not_paginated(client):
+    for i in range(7):
+        add_task(f'Report {i}', 'report ' * (i + 1))
+    body = client.get('/tasks?q=report&limit=3').get_json()
+    assert [task['title'] for task in body['data']] == ['Report 6', 'Report 5', 'Report 4']
+    assert body['next_cursor'] is None
+
+    cursor = client.get('/tasks?sort_by=created_at&limit=3').get_json()['next_cursor']
+    response = client.get(f'/tasks?q=report&sort_by=relevance&limit=3&cursor={cursor}')
+    assert response.status_code == 400
+    assert 'not paginated' in response.get_json()['message']
+
+def test_search_pages_stay_stable_across_writes(client):
+    for i in range(7):
+        add_task(f'Report {i}', 'report ' * (i + 1))
+    body = client.get('/tasks?q=report&sort_by=created_at&order=asc&limit=3').get_json()
+    titles = [task['title'] for task in body['data']]
+
+    # Writes that change every row's bm25 score don't move the created_at pages
+    add_task('Report report report', 'report ' * 20)
+    client.delete(f"/tasks/{body['data'][0]['id']}")
+    while body['next_cursor']:
+        body = client.get(f"/tasks?q=report&sort_by=created_at&order=asc&limit=3"
+                          f"&cursor={body['next_cursor']}").get_json()
+        titles.extend(task['title'] for task in body['data'])
+    assert titles == [f'Report {i}' for i in range(7)] + ['Report report report']
+
+def test_search_ranks_only_the_newest_matches(client):
+    client.application.config['TASKS_SEARCH_MAX_RANKED'] = 3
+    add_task('Budget', 'Budget budget budget')
+    for title in ['Budget review', 'Team lunch', 'Call about the budget']:
+        add_task(title, 'Ask about the budget')
+    # The best match is older than the three most recent ones, so it isn't ranked
+    assert sorted(search(client, 'q=budget')) == ['Budget review', 'Call about the budget', 'Team lunch']
+    assert search(client, 'q=budget&sort_by=title&order=asc')[0] == 'Budget'
+
+def test_search_query_syntax_is_escaped(client):
+    add_task('Review "draft" AND notes')
+    assert search(client, 'q=%22draft%22%20AND') == ['Review "draft" AND notes']
+    assert search(client, 'q=NOT%20OR%20(') == []
+
+def test_search_invalid_params(client):
+    assert client.get('/tasks?q=%20%22%20').status_code == 400
+    assert client.get('/tasks?sort_by=relevance').status_code == 400
+
+def test_reindex_command(client):
+    add_task('Buy milk')
+    db.session.execute(db.text("INSERT INTO tasks_fts (tasks_fts) VALUES ('delete-all')"))
+    db.session.commit()
+    assert search(client, 'q=milk&limit=5') == []
+
+    result = client.application.test_cli_runner().invoke(args=['tasks', 'reindex'])
+    assert result.exit_code == 0, result.output
+    assert search(client, 'q=milk&limit=10') == ['Buy milk']
+
+def test_upgrade_indexes_existing_tasks(client, tmp_path):
+    import sqlite3
+    from sqlalchemy import create_engine
+    from app.migrations import upgrade
+
+    path = tmp_path / 'tasks.db'
+    conn = sqlite3.connect(path)
+    conn.execute(
+        'CREATE TABLE tasks (id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, description TEXT, '
+        'category VARCHAR(50) NOT NULL, priority VARCHAR(10) NOT NULL, deadline DATETIME NOT NULL, '
+        'created_at DATETIME, updated_at DATETIME, PRIMARY KEY (id))'
+    )
+    conn.execute("INSERT INTO tasks (title, description, category, priority, deadline) "
+                 "VALUES ('Old task', 'Written before search existed', 'Work', 'High', '2025-01-01 00:00:00')")
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f'sqlite:///{path}')
+    assert 'add_task_search' in upgrade(engine)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'existed'").all()
+    assert rows == [(1,)]
+    engine.dispose()
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app, db
+from app.json import ORJSONProvider, orjson
+from app.models import Task
+from app.routes import task_columns
+from app.schemas import task_row_encoder, tasks_schema
+from tests.conftest import TestConfig
+
+TITLES = ['Plain', 'Ünïcødé ✓', 'Quote " and \\ slash', 'Control \x00\x1f\x7f', 'Line\nbreak\ttab', '日本語']
+
+def add_tricky_tasks():
+    for i, title in enumerate(TITLES):
+        db.session.add(Task(title=title, description=None if i % 2 else f'Desc {title}',
+                            category='Work', priority='High',
+                            deadline=datetime(2025, 1, 1 + i, 12, 30, 0, 123456 * (i % 2)),
+                            created_at=datetime(2025, 1, 1, 0, 0, i)))
+    db.session.commit()
+
+def test_row_encoder_matches_task_schema(client):
+    add_tricky_tasks()
+    tasks = Task.query.order_by(Task.id).all()
+    rows = db.session.execute(db.select(*task_columns()).order_by(Task.id)).all()
+    assert task_row_encoder.dump_many(rows) == tasks_schema.dump(tasks)
+
+def test_row_encoder_handles_null_datetimes(client):
+    add_tricky_tasks()
+    db.session.execute(db.update(Task).values(updated_at=None))
+    db.session.commit()
+    tasks = Task.query.order_by(Task.id).all()
+    rows = db.session.execute(db.select(*task_columns()).order_by(Task.id)).all()
+    assert task_row_encoder.dump_many(rows) == tasks_schema.dump(tasks)
+
+@pytest.mark.parametrize('use_orjson', [False, True])
+def test_get_tasks_bytes_match_schema_output(use_orjson):
+    if use_orjson and orjson is None:
+        pytest.skip('orjson is not installed')
+
+    class ProviderConfig(TestConfig):
+        ORJSON_PROVIDER = use_orjson
+
+    app = create_app(ProviderConfig)
+    assert isinstance(app.json, ORJSONProvider) == use_orjson
+    with app.app_context():
+        db.create_all()
+        add_tricky_tasks()
+        body = app.test_client().get('/tasks?sort_by=created_at&order=asc').get_data()
+
+        # What GET /tasks produced through marshmallow and the default provider
+        tasks = Task.query.order_by(Task.created_at, Task.id).all()
+        expected = DefaultJSONProvider(app).response({
+            'message': 'Tasks retrieved successfully',
+            'data': tasks_schema.dump(tasks),
+            'next_cursor': None
+        }).get_data()
+        assert body == expected
+        db.drop_all()
+
+@pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+def test_orjson_provider_matches_default_provider(client):
+    app = client.application
+    default = DefaultJSONProvider(app)
+    provider = ORJSONProvider(app)
+    values = [
+        {'b': 1, 'a': [None, True, 'x\x7fy'], 'c': {'z': 'é', 'y': 2}},
+        {'when': datetime(2025, 1, 2, 3, 4, 5)},
+        {1: 'non-string key'},
+        list(range(5)),
+    ]
+    for value in values:
+        assert provider.dumps(value, separators=(',', ':')) == default.dumps(value, separators=(',', ':'))
+
+@pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+@pytest.mark.parametrize('kwargs', [{}, {'indent': 2}, {'sort_keys': False},
+                                    {'separators': (',', ':'), 'sort_keys': False},
+                                    {'separators': (', ', ': ')}])
+def test_orjson_provider_honours_dumps_arguments(client, kwargs):
+    app = client.application
+    value = {'b': 1, 'a': [None, {'d': 'x', 'c': 2}]}
+    assert ORJSONProvider(app).dumps(value, **kwargs) == DefaultJSONProvider(app).dumps(value, **kwargs)
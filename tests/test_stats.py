@@ -0,0 +1,92 @@
+import random
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Task
+from app.stats import stats_differences
+
+CATEGORIES = ['Work', 'Home', 'Errands']
+PRIORITIES = ['Low', 'Medium', 'High']
+
+def payload(rng):
+    deadline = datetime(2025, 1, 1) + timedelta(hours=rng.randrange(24 * 20))
+    return {'title': 'Task', 'category': rng.choice(CATEGORIES), 'priority': rng.choice(PRIORITIES),
+            'deadline': deadline.strftime('%Y-%m-%d %H:%M:%S')}
+
+def assert_consistent():
+    with db.engine.connect() as conn:
+        assert stats_differences(conn) == []
+
+def test_stats_follow_random_writes(client):
+    rng = random.Random(1234)
+    ids = []
+    for step in range(300):
+        action = rng.random()
+        if action < 0.35 or not ids:
+            ids.append(client.post('/tasks', json=payload(rng)).get_json()['task']['id'])
+        elif action < 0.45:
+            response = client.post('/tasks/bulk', json=[payload(rng) for _ in range(rng.randint(1, 5))])
+            ids.extend(result['id'] for result in response.get_json()['results'])
+        elif action < 0.7:
+            changes = payload(rng)
+            fields = rng.sample(['category', 'priority', 'deadline', 'title'], rng.randint(1, 3))
+            client.put(f'/tasks/{rng.choice(ids)}', json={field: changes[field] for field in fields})
+        elif action < 0.8:
+            batch = rng.sample(ids, min(len(ids), 3))
+            client.patch('/tasks/bulk', json=[dict(payload(rng), id=task_id) for task_id in batch])
+        elif action < 0.95:
+            client.delete(f'/tasks/{ids.pop(rng.randrange(len(ids)))}')
+        else:
+            batch = [ids.pop(rng.randrange(len(ids))) for _ in range(min(len(ids), 2))]
+            client.delete('/tasks/bulk', json=batch)
+        if step % 50 == 0:
+            assert_consistent()
+    assert_consistent()
+
+def test_get_task_stats(client):
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    for category, priority, days in [('Work', 'High', -3), ('Work', 'Low', 0), ('Home', 'High', 2),
+                                     ('Home', 'Medium', 30), ('Work', 'High', 5)]:
+        db.session.add(Task(title='Task', category=category, priority=priority,
+                            deadline=today + timedelta(days=days)))
+    db.session.commit()
+
+    body = client.get('/tasks/stats').get_json()
+    assert body['total'] == 5
+    assert body['by_category'] == {'Work': 3, 'Home': 2}
+    assert body['by_priority'] == {'High': 3, 'Low': 1, 'Medium': 1}
+    assert body['by_deadline'] == {'overdue': 1, 'due_today': 1, 'upcoming': 2, 'later': 1}
+
+    body = client.get('/tasks/stats?category=Work&upcoming_days=3').get_json()
+    assert body['total'] == 3
+    assert body['by_deadline'] == {'overdue': 1, 'due_today': 1, 'upcoming': 0, 'later': 1}
+
+    deadline_from = (today + timedelta(days=1)).strftime('%Y-%m-%d')
+    body = client.get(f'/tasks/stats?priority=High&deadline_from={deadline_from}').get_json()
+    assert body['total'] == 2
+
+def test_get_task_stats_invalid_params(client):
+    assert client.get('/tasks/stats?upcoming_days=-1').status_code == 400
+    assert client.get('/tasks/stats?upcoming_days=99999999999').status_code == 400
+    response = client.get('/tasks/stats?upcoming_days=²')
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith('Invalid upcoming_days: ².')
+    assert client.get('/tasks/stats?upcoming_days=3650').status_code == 200
+    assert client.get('/tasks/stats?deadline_to=tomorrow').status_code == 400
+
+def test_check_stats_command(client):
+    client.post('/tasks', json={'title': 'Task', 'category': 'Work', 'priority': 'High', 'deadline': '2025-01-01'})
+    runner = client.application.test_cli_runner()
+    result = runner.invoke(args=['tasks', 'check-stats'])
+    assert result.exit_code == 0
+    assert 'consistent' in result.output
+
+    db.session.execute(db.text('UPDATE task_stats SET task_count = 7'))
+    db.session.commit()
+    result = runner.invoke(args=['tasks', 'check-stats'])
+    assert result.exit_code == 1
+    assert 'stored 7, actual 1' in result.output
+
+    result = runner.invoke(args=['tasks', 'check-stats', '--rebuild'])
+    assert result.exit_code == 0
+    assert_consistent()
@@ -0,0 +1,11 @@
+"""WSGI entry point using the production SQLite profile.
+
+    gunicorn --workers 1 --threads 16 wsgi:app
+
+Writes are serialized by a lock inside the process, so run one worker
+process with several threads rather than several processes.
+"""
+from app import create_app
+from config import ProductionConfig
+
+app = create_app(ProductionConfig)